@@ -0,0 +1,151 @@
+"""
+Recall / latency / storage benchmark for quantized embedding search.
+
+For one table it compares exact top-k (index scans disabled) against
+float32 hnsw, halfvec and bit shortlists re-ranked exactly at several
+rerank factors, and prints the on-disk size of each embedding index.
+Query vectors are sampled from the table itself (plus a little noise),
+so it works on real guidance / entity data as well as synthetic chunks.
+The compact indexes are opt-in: apply migrations/optional/quantized_*.sql
+first, or the halfvec / bit rows fall back to sequential scans.
+
+    python -m benchmarks.quantization_benchmark --table vector_chunks --load
+    python -m benchmarks.quantization_benchmark --table entity_embeddings
+    python -m benchmarks.quantization_benchmark --table guidance_embeddings --rerank 2 4 8
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.vector_index_benchmark import BENCH_SOURCE, load_chunks
+from src.database import quantization as quant
+from src.database.db import ConnectionPool, from_vector, to_vector
+from src.database.vector.vector_store import VectorStore
+
+TABLES = {
+    "vector_chunks": "cosine",
+    "entity_embeddings": "cosine",
+    "guidance_embeddings": "l2",
+}
+
+
+def index_sizes(pool: ConnectionPool, table: str) -> list[tuple[str, str]]:
+    query = """
+    SELECT indexrelid::regclass::text, pg_size_pretty(pg_relation_size(indexrelid))
+    FROM pg_index
+    WHERE indrelid = %s::regclass
+      AND pg_get_indexdef(indexrelid) LIKE '%%embedding%%'
+    ORDER BY pg_relation_size(indexrelid) DESC
+    """
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(query, (table,))
+        return cur.fetchall()
+
+
+def sample_queries(pool: ConnectionPool, table: str, *, n: int, noise: float, seed: int):
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(f"SELECT embedding FROM {table} ORDER BY random() LIMIT %s", (n,))
+        vectors = np.vstack([from_vector(row[0]) for row in cur.fetchall()])
+
+    rng = np.random.default_rng(seed)
+    return vectors + noise * rng.standard_normal(vectors.shape, dtype=np.float32)
+
+
+def search(pool, table, metric, query, *, k, quantization, rerank_factor, ef_search, exact=False):
+    exact_sql = quant.exact_distance("embedding", "%s::vector", metric=metric)
+    coarse_sql = quant.coarse_distance(
+        "embedding", "%s::vector", quantization=quantization, metric=metric
+    )
+    candidates = k * rerank_factor if quantization else k
+
+    sql = f"""
+    SELECT ctid::text
+    FROM (
+        SELECT ctid, embedding
+        FROM {table}
+        ORDER BY {coarse_sql}
+        LIMIT %s
+    ) candidates
+    ORDER BY {exact_sql}
+    LIMIT %s
+    """
+
+    vec = to_vector(query)
+    start = time.perf_counter()
+    with pool.transaction() as conn, conn.cursor() as cur:
+        if exact:
+            cur.execute("SET LOCAL enable_indexscan = off")
+        else:
+            cur.execute("SET LOCAL hnsw.ef_search = %s", (min(1000, max(ef_search, candidates)),))
+        cur.execute(sql, (vec, candidates, vec, k))
+        ids = {row[0] for row in cur.fetchall()}
+    return ids, time.perf_counter() - start
+
+
+def run(args):
+    pool = ConnectionPool(dbname="rag_app_dev", statement_timeout_ms=None)
+    metric = TABLES[args.table]
+
+    if args.load:
+        if args.table != "vector_chunks":
+            raise ValueError("--load only generates vector_chunks")
+        store = VectorStore(pool=pool, ann_method=None)
+        load_chunks(store, n=args.chunks, dim=quant.EMBEDDING_DIM, files=args.files, seed=args.seed)
+
+    print(f"\nindexes on {args.table}:")
+    for name, size in index_sizes(pool, args.table):
+        print(f"  {size:>10}  {name}")
+
+    queries = sample_queries(pool, args.table, n=args.queries, noise=args.noise, seed=args.seed)
+    truth = [
+        search(pool, args.table, metric, q, k=args.k, quantization=None,
+               rerank_factor=1, ef_search=args.ef_search, exact=True)[0]
+        for q in queries
+    ]
+
+    configs = [(None, 1)] + [(q, r) for q in quant.QUANTIZATIONS for r in args.rerank]
+
+    print(f"\n{'index':>8} {'rerank':>7} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for quantization, rerank_factor in configs:
+        recalls, latencies = [], []
+        for q, expected in zip(queries, truth):
+            got, elapsed = search(
+                pool, args.table, metric, q, k=args.k, quantization=quantization,
+                rerank_factor=rerank_factor, ef_search=args.ef_search,
+            )
+            recalls.append(len(got & expected) / max(1, len(expected)))
+            latencies.append(elapsed * 1000)
+
+        latencies.sort()
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(
+            f"{quantization or 'vector':>8} {rerank_factor:>7} "
+            f"{statistics.mean(recalls):>10.3f} "
+            f"{statistics.median(latencies):>8.2f} {p95:>8.2f}"
+        )
+
+    if args.cleanup and args.table == "vector_chunks":
+        VectorStore(pool=pool).delete_file(BENCH_SOURCE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--table", choices=sorted(TABLES), default="vector_chunks")
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--ef-search", type=int, default=100)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[2, 4, 10])
+    parser.add_argument("--load", action="store_true", help="insert synthetic chunks first")
+    parser.add_argument("--cleanup", action="store_true", help="delete synthetic files afterwards")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Latency / recall benchmark for VectorStore.similarity_search ANN settings.
+
+Runs against the dev database (rag_app_dev). Loads N synthetic chunks
+spread over files with access levels 1..3, then compares exact top-k
+(index scans disabled) against hnsw / ivfflat at several ef_search / probes
+values, with the same access_level and type filters the app uses.
+
+    python -m benchmarks.vector_index_benchmark --chunks 1000000 --load
+    python -m benchmarks.vector_index_benchmark --method ivfflat --lists 1000
+"""
+
+import argparse
+import statistics
+import time
+from uuid import uuid4
+
+import numpy as np
+
+from src.database.db import ConnectionPool
+from src.database.vector.vector_store import VectorStore
+from src.models.document import StoredChunk, StoredFile
+from src.schema.schema import system_user
+
+BENCH_SOURCE = "benchmark:vector_index"
+
+
+def load_chunks(store: VectorStore, *, n: int, dim: int, files: int, seed: int):
+    rng = np.random.default_rng(seed)
+    per_file = max(1, n // files)
+
+    for i in range(files):
+        stored_file = StoredFile(
+            id=uuid4(),
+            owner_id=system_user.id,
+            role=system_user.role,
+            access_level=1 + i % 3,
+            source=BENCH_SOURCE,
+        )
+        vectors = rng.standard_normal((per_file, dim), dtype=np.float32)
+        chunks = [
+            StoredChunk(
+                id=uuid4(),
+                file_id=stored_file.id,
+                content=f"bench chunk {i}:{j}",
+                embedding=vec,
+                metadata={},
+            )
+            for j, vec in enumerate(vectors)
+        ]
+
+        with store.pool.transaction():
+            store.insert_file(stored_file)
+            store.insert_chunks(chunks, type="vector" if i % 4 else "bench_other")
+
+        print(f"loaded {(i + 1) * per_file}/{n}", end="\r")
+    print()
+
+
+def exact_search(store: VectorStore, query, *, k: int, access_level: int):
+    method = store.ann_method
+    store.ann_method = None
+    try:
+        with store.pool.transaction() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL enable_indexscan = off")
+            return store.similarity_search(query, k, access_level)
+    finally:
+        store.ann_method = method
+
+
+def timed_search(store: VectorStore, query, *, k: int, access_level: int, **params):
+    start = time.perf_counter()
+    docs = store.similarity_search(query, k, access_level, **params)
+    elapsed = time.perf_counter() - start
+    return docs, elapsed
+
+
+def run(args):
+    pool = ConnectionPool(dbname="rag_app_dev", statement_timeout_ms=None)
+    store = VectorStore(pool=pool, ann_method=None)
+
+    if args.load:
+        load_chunks(store, n=args.chunks, dim=args.dim, files=args.files, seed=args.seed)
+
+    print(f"building {args.method} index...")
+    start = time.perf_counter()
+    store.create_index(
+        method=args.method,
+        m=args.m,
+        ef_construction=args.ef_construction,
+        lists=args.lists,
+    )
+    print(f"index build: {time.perf_counter() - start:.1f}s")
+
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT pg_size_pretty(pg_total_relation_size('vector_chunks'))")
+        print(f"vector_chunks size: {cur.fetchone()[0]}")
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    access_levels = [1 + i % 3 for i in range(args.queries)]
+
+    truth = [
+        {d.metadata["chunk_id"] for d in exact_search(store, q, k=args.k, access_level=lvl)}
+        for q, lvl in zip(queries, access_levels)
+    ]
+
+    sweep = args.ef_search if args.method == "hnsw" else args.probes
+    key = "ef_search" if args.method == "hnsw" else "probes"
+
+    print(f"\n{key:>10} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for value in sweep:
+        recalls, latencies = [], []
+        for q, lvl, expected in zip(queries, access_levels, truth):
+            docs, elapsed = timed_search(store, q, k=args.k, access_level=lvl, **{key: value})
+            got = {d.metadata["chunk_id"] for d in docs}
+            recalls.append(len(got & expected) / max(1, len(expected)))
+            latencies.append(elapsed * 1000)
+
+        latencies.sort()
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(
+            f"{value:>10} {statistics.mean(recalls):>10.3f} "
+            f"{statistics.median(latencies):>8.2f} {p95:>8.2f}"
+        )
+
+    if args.cleanup:
+        store.delete_file(BENCH_SOURCE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--method", choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=1000)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 100, 200])
+    parser.add_argument("--probes", type=int, nargs="+", default=[10, 30, 100])
+    parser.add_argument("--load", action="store_true", help="insert synthetic chunks first")
+    parser.add_argument("--cleanup", action="store_true", help="delete synthetic files afterwards")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+-- ANN index for VectorStore.similarity_search (cosine distance).
+-- Filtered top-k relies on pgvector >= 0.8 iterative index scans
+-- (hnsw.iterative_scan, set per query by VectorStore).
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS vector_chunks_embedding_hnsw_idx
+ON vector_chunks USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS vector_chunks_file_id_idx
+ON vector_chunks (file_id);
+
+CREATE INDEX IF NOT EXISTS files_access_level_idx
+ON files (access_level);
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- Lexical index for hybrid retrieval (VectorStore.lexical_search).
+-- The generated column is maintained by Postgres on every insert/delete,
+-- so the GIN index is always incremental and never rebuilt per query.
+
+BEGIN;
+
+ALTER TABLE vector_chunks
+ADD COLUMN IF NOT EXISTS content_tsv tsvector
+GENERATED ALWAYS AS (to_tsvector('english', content)) STORED;
+
+CREATE INDEX IF NOT EXISTS vector_chunks_content_tsv_idx
+ON vector_chunks USING gin (content_tsv);
+
+COMMIT;
@@ -0,0 +1,23 @@
+-- Chunk-level content hashes for incremental re-ingestion
+-- (VectorIngestor diffs a re-added source against stored hashes and only
+-- embeds / inserts chunks that changed).
+
+BEGIN;
+
+ALTER TABLE vector_chunks
+ADD COLUMN IF NOT EXISTS content_hash text;
+
+UPDATE vector_chunks
+SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+WHERE content_hash IS NULL;
+
+ALTER TABLE vector_chunks
+ALTER COLUMN content_hash SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS vector_chunks_file_id_content_hash_idx
+ON vector_chunks (file_id, content_hash);
+
+CREATE INDEX IF NOT EXISTS files_owner_id_source_idx
+ON files (owner_id, source);
+
+COMMIT;
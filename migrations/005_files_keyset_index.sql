@@ -0,0 +1,14 @@
+-- Keyset pagination for VectorStore.list_files:
+-- WHERE owner_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+-- reads exactly one page from this index. The text_pattern_ops index
+-- serves source-prefix (LIKE 'prefix%') filters under any collation.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS files_owner_id_created_at_id_idx
+ON files (owner_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS files_owner_id_source_pattern_idx
+ON files (owner_id, source text_pattern_ops);
+
+COMMIT;
@@ -0,0 +1,12 @@
+-- Metadata filter pushdown (src/database/vector/metadata_filter.py).
+-- Filters compile to `metadata @> ...` and `metadata @? jsonpath`, which
+-- jsonb_path_ops serves with a smaller index than the default jsonb_ops.
+-- Selective filters can use this index plus an exact sort; broad ones
+-- stay on the HNSW index with iterative scans.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS vector_chunks_metadata_gin_idx
+ON vector_chunks USING gin (metadata jsonb_path_ops);
+
+COMMIT;
@@ -0,0 +1,24 @@
+-- Opt-in: binary (1 bit/dim) ANN indexes for quantization="bit"
+-- (src/database/quantization.py). Not part of the numbered sequence: the
+-- default float32 search never reads them, so apply this only on
+-- installs that configure bit search (or run
+-- benchmarks/quantization_benchmark.py), and only for the tables that use it.
+-- Embeddings stay float32 `vector` columns and serve as the exact re-rank source.
+-- Requires pgvector >= 0.7.
+
+BEGIN;
+
+-- vector_chunks
+CREATE INDEX IF NOT EXISTS vector_chunks_embedding_bit_hnsw_idx
+ON vector_chunks USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- entity_embeddings
+CREATE INDEX IF NOT EXISTS entity_embeddings_embedding_bit_hnsw_idx
+ON entity_embeddings USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops);
+
+-- guidance_embeddings
+CREATE INDEX IF NOT EXISTS guidance_embeddings_embedding_bit_hnsw_idx
+ON guidance_embeddings USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops);
+
+COMMIT;
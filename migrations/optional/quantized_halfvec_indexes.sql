@@ -0,0 +1,24 @@
+-- Opt-in: halfvec (2 bytes/dim) ANN indexes for quantization="halfvec"
+-- (src/database/quantization.py). Not part of the numbered sequence: the
+-- default float32 search never reads them, so apply this only on
+-- installs that configure halfvec search (or run
+-- benchmarks/quantization_benchmark.py), and only for the tables that use it.
+-- Embeddings stay float32 `vector` columns and serve as the exact re-rank source.
+-- Requires pgvector >= 0.7.
+
+BEGIN;
+
+-- vector_chunks (cosine)
+CREATE INDEX IF NOT EXISTS vector_chunks_embedding_halfvec_hnsw_idx
+ON vector_chunks USING hnsw ((embedding::halfvec(384)) halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- entity_embeddings (cosine)
+CREATE INDEX IF NOT EXISTS entity_embeddings_embedding_halfvec_hnsw_idx
+ON entity_embeddings USING hnsw ((embedding::halfvec(384)) halfvec_cosine_ops);
+
+-- guidance_embeddings (l2)
+CREATE INDEX IF NOT EXISTS guidance_embeddings_embedding_halfvec_hnsw_idx
+ON guidance_embeddings USING hnsw ((embedding::halfvec(384)) halfvec_l2_ops);
+
+COMMIT;
@@ -1,3 +1,6 @@
+import time
+_import_start = time.perf_counter()
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from psycopg import Connection
 
@@ -7,32 +10,41 @@ from src.database.entity.entity_store import EntityStore
 from src.database.guidance import guidance_store
 from src.database.guidance.guidance_ingestor import GuidanceIngestor
 from src.database.llm import create_groq_llm
-from src.database.db import get_connection, get_dev_connection
+from src.database.db import get_dev_connection, get_pool
 from src.database.guidance.guidance_retriever import GuidanceRetriever
 from src.database.sql.sql_ingestion import SQLIngester
 from src.database.sql.sql_retriever import SQLRetriever
+from src.database.sql.plan_cache import PlanCache
 from src.database.sql.sql_store import SQLStore
 from src.database.vector.vector_ingestor import VectorIngestor
 from src.database.vector.vector_store import VectorStore
 from src.database.vector.vector_retriever import VectorRetriever
+from src.database.vector.faiss_index import FaissVectorIndex
 from src.database.llm import create_vision_llm, create_google_llm
 from src.database.dependencies import create_embedder
 from src.database.guidance.guidance_store import GuidanceStore
 
 from src.pipelines.retrieval_pipeline import RetrievalPipeline
+from src.pipelines.reranker_pipeline import Reranker
 from src.pipelines.scraping.scrape_ingestion_pipeline import ScrapeIngestionPipeline
 from src.pipelines.vector_ingestion import VectorIngestion
+from src.pipelines.directory_ingestion import DirectoryIngestion
 from src.pipelines.answer_pipeline import AnswerPipeline
+from src.pipelines.chat_history import ChatHistory
+from src.pipelines.answer_cache import AnswerCache
 from src.pipeline import MainPipeline
+from src.util.lazy import Lazy, record
+
+record("bootstrap imports", time.perf_counter() - _import_start)
 
 # ---------- Shared resources ----------
 
 def create_dev_conn():
     return get_dev_connection()
 
-def create_entity_store(conn):
+def create_entity_store(pool):
     print("loaded entity store")
-    return EntityStore(conn=conn)
+    return EntityStore(pool=pool)
 
 def create_entity_retriever(entity_store, embedder):
     print("loaded entity retriever")
@@ -42,29 +54,45 @@ def create_entity_ingestor(entity_store, embedder):
     print("loaded entity ingestor")
     return EntityIngestor(entity_store=entity_store, embedder=embedder)
 
-def create_vector_store(conn):
+def create_vector_store(pool):
     print("loaded vector store")
-    return VectorStore(conn=conn)
+    # relaxed_order keeps filtered top-k full; ignored on pgvector < 0.8
+    return VectorStore(pool=pool, ann_method="hnsw", iterative_scan="relaxed_order")
+
 
+def create_faiss_index(vector_store, kind="flat"):
+    index = FaissVectorIndex(vector_store=vector_store, kind=kind)
+    count = index.load()
+    print(f"loaded faiss index ({kind}, {count} chunks)")
+    return index
 
-def create_vector_retriever(vector_store, embedder):
+
+def create_vector_retriever(vector_store, embedder, faiss_index=None):
     print("loaded vector retriever")
-    return VectorRetriever(vector_store=vector_store, embedder=embedder)
+    return VectorRetriever(
+        vector_store=vector_store,
+        embedder=embedder,
+        faiss_index=faiss_index,
+        hybrid=True,
+        mmr=True,
+        max_per_group=2,
+        group_keys=("faculty_id",),
+    )
 
 
-def create_vector_ingestor(conn, vector_store):
+def create_vector_ingestor(pool, vector_store, embedder, faiss_index=None):
     print("loaded vector ingestor")
-    embedder = create_embedder()
     return VectorIngestor(
         vector_store=vector_store,
         embedder=embedder,
-        conn=conn,
+        pool=pool,
+        faiss_index=faiss_index,
     )
 
 
-def create_connection():
-    print('loaded connection')
-    return get_connection()
+def create_pool():
+    print('loaded connection pool')
+    return get_pool()
 
 
 def create_text_splitter():
@@ -75,13 +103,13 @@ def create_text_splitter():
         chunk_overlap=50,
     )
 
-def create_guidance_store(conn):
+def create_guidance_store(pool):
     print('loaded vector store')
-    return GuidanceStore(conn=conn)
+    return GuidanceStore(pool=pool)
 
-def create_sql_store(conn):
+def create_sql_store(pool):
     return SQLStore(
-        conn=conn
+        pool=pool
     )
 
 
@@ -91,7 +119,8 @@ def create_sql_retriever(guidance_retriever, sql_store, llm, embedder, entity_re
         sql_store=sql_store,
         llm=llm,
         embedder=embedder,
-        entity_retriver=entity_retriever
+        entity_retriver=entity_retriever,
+        plan_cache=PlanCache()
     )
 
 def create_sql_ingestor(sql_store):
@@ -100,7 +129,8 @@ def create_sql_ingestor(sql_store):
 def create_guidance_retriever(guidance_store, embedder):
     return GuidanceRetriever(
         guidance_store=guidance_store,
-        embedder=embedder
+        embedder=embedder,
+        in_memory=True
     )
 
 def create_guidance_ingestor(guidance_store, embedder):
@@ -119,17 +149,30 @@ def create_vector_ingestion(vector_ingestor):
         ingestor=vector_ingestor,
     )
 
+def create_directory_ingestion(vector_ingestor):
+    return DirectoryIngestion(
+        splitter=create_text_splitter(),
+        ingestor=vector_ingestor,
+    )
+
 
 def create_answer_pipeline(llm):
     return AnswerPipeline(
         llm=llm,
     )
 
-def create_retrieval_pipeline(vector_retriever, sql_retriever, routing_llm):
+def create_chat_history():
+    return ChatHistory(llm=llm)
+
+def create_reranker():
+    return Reranker()
+
+def create_retrieval_pipeline(vector_retriever, sql_retriever, routing_llm, reranker=None):
     return RetrievalPipeline(
         vector_retriever=vector_retriever,
         sql_retriever=sql_retriever,
-        routing_llm=routing_llm
+        routing_llm=routing_llm,
+        reranker=reranker
     )
 
 def create_scrape_ingestion_pipeline(sql_ingestor, sql_retriever, vector_ingestor, embedder):
@@ -140,44 +183,55 @@ def create_scrape_ingestion_pipeline(sql_ingestor, sql_retriever, vector_ingesto
         embedder=embedder
     )
 
-conn = create_connection()
-llm = create_groq_llm()
-embedder = create_embedder()
+# Built on first use, once per process, so commands that never touch
+# the model or the LLM don't pay for them.
+pool = Lazy("connection pool", create_pool)
+llm = Lazy("llm", create_groq_llm)
+embedder = Lazy("embedder", create_embedder)
 
 
 # ---------- App wiring ----------
 
-def create_app() -> MainPipeline:
+def create_app(*, faiss_kind: str | None = None, rerank: bool = True) -> MainPipeline:
+    start = time.perf_counter()
 
-    entity_store = create_entity_store(conn=conn)
+    entity_store = create_entity_store(pool=pool)
     entity_retriever = create_entity_retriever(entity_store=entity_store, embedder=embedder)
 
     # guidance
-    guidance_store = create_guidance_store(conn=conn)
+    guidance_store = create_guidance_store(pool=pool)
     guidance_retriever = create_guidance_retriever(guidance_store=guidance_store, embedder=embedder)
     guidance_ingestor = create_guidance_ingestor(guidance_store=guidance_store, embedder=embedder)
 
     # --- Vector infra ---
-    vector_store = create_vector_store(conn=conn)
-    vector_retriever = create_vector_retriever(vector_store=vector_store, embedder=embedder)
-    vector_ingestor = create_vector_ingestor(conn=conn, vector_store=vector_store)
+    vector_store = create_vector_store(pool=pool)
+    faiss_index = create_faiss_index(vector_store=vector_store, kind=faiss_kind) if faiss_kind else None
+    vector_retriever = create_vector_retriever(vector_store=vector_store, embedder=embedder, faiss_index=faiss_index)
+    vector_ingestor = create_vector_ingestor(pool=pool, vector_store=vector_store, embedder=embedder, faiss_index=faiss_index)
 
     # sql
-    sql_store = create_sql_store(conn=conn)
+    sql_store = create_sql_store(pool=pool)
     sql_retriever = create_sql_retriever(guidance_retriever=guidance_retriever, llm=llm, sql_store=sql_store, embedder=embedder, entity_retriever=entity_retriever)
     sql_ingestor = create_sql_ingestor(sql_store=sql_store)
 
     # --- Pipelines ---
     vector_ingestion = create_vector_ingestion(vector_ingestor=vector_ingestor)
+    directory_ingestion = create_directory_ingestion(vector_ingestor=vector_ingestor)
     answer_pipeline = create_answer_pipeline(llm=llm)
-    retrieval = create_retrieval_pipeline(vector_retriever=vector_retriever, sql_retriever=sql_retriever, routing_llm=llm)
+    retrieval = create_retrieval_pipeline(vector_retriever=vector_retriever, sql_retriever=sql_retriever, routing_llm=llm, reranker=create_reranker() if rerank else None)
     scrape_ingestion = create_scrape_ingestion_pipeline(sql_ingestor=sql_ingestor, sql_retriever=sql_retriever, vector_ingestor=vector_ingestor, embedder=embedder)
 
+    record("app wiring", time.perf_counter() - start)
+
     return MainPipeline(
         vector_ingestion=vector_ingestion,
+        directory_ingestion=directory_ingestion,
+        answer_cache=AnswerCache(),
         scrape_ingestion=scrape_ingestion,
         answer=answer_pipeline,
         retrieval=retrieval,
-        guidance_ingestor=guidance_ingestor
+        guidance_ingestor=guidance_ingestor,
+        vector_retriever=vector_retriever,
+        pool=pool,
     )
 
@@ -1,21 +1,205 @@
-from multiprocessing import connection
+import threading
+from contextlib import contextmanager
+
+import numpy as np
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+from pgvector.psycopg2 import register_vector
+
+DB_CONFIG = {
+    "user": "postgres",
+    "password": "12345",
+    "host": "localhost",
+    "port": 5432,
+}
 
 def get_connection():
-    return psycopg2.connect(
-        dbname="rag_app",
-        user="postgres",
-        password="12345",
-        host="localhost",
-        port=5432,
-    )
+    conn = psycopg2.connect(dbname="rag_app", **DB_CONFIG)
+    register_vector(conn)
+    return conn
 
 def get_dev_connection():
-    return psycopg2.connect(
-        dbname="rag_app_dev",
-        user="postgres",
-        password="12345",
-        host="localhost",
-        port=5432,
-    )
\ No newline at end of file
+    conn = psycopg2.connect(dbname="rag_app_dev", **DB_CONFIG)
+    register_vector(conn)
+    return conn
+
+def to_vector(embedding) -> np.ndarray:
+    """
+    Pack an embedding as a float32 array so the registered pgvector
+    adapter serializes it directly instead of psycopg2 rendering a
+    Python list as an ARRAY[...] of full-precision decimals.
+    """
+    return np.asarray(embedding, dtype=np.float32)
+
+def from_vector(value) -> np.ndarray:
+    """
+    Read side of to_vector(): the pgvector adapter returns ndarrays up to
+    0.3 and `Vector` objects (which numpy can't convert) from 0.4 on.
+    """
+    if hasattr(value, "to_numpy"):
+        value = value.to_numpy()
+    return np.asarray(value, dtype=np.float32)
+
+
+class _VectorConnectionPool(ThreadedConnectionPool):
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        register_vector(conn)
+        conn.commit()
+        return conn
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 pool shared by all stores.
+
+    connection()  -> one unit of work: commits on success, rolls back on
+                     error, returns the connection to the pool.
+    transaction() -> binds a connection to the current thread so every
+                     store call inside the block joins one transaction.
+    after_commit() -> defers a callback until that transaction commits.
+
+    Checkouts block (instead of raising) while all `maxconn` connections
+    are in use, and every checkout gets its own statement_timeout.
+    """
+
+    def __init__(
+        self,
+        *,
+        dbname: str = "rag_app",
+        minconn: int = 1,
+        maxconn: int = 10,
+        statement_timeout_ms: int | None = 30_000,
+        **connect_kwargs,
+    ):
+        self.statement_timeout_ms = statement_timeout_ms
+        self._pool = _VectorConnectionPool(
+            minconn,
+            maxconn,
+            dbname=dbname,
+            **{**DB_CONFIG, **connect_kwargs},
+        )
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._local = threading.local()
+
+    # ---------- checkout ----------
+
+    def _checkout(self):
+        self._slots.acquire()
+        try:
+            # one retry: a dead connection is discarded and replaced
+            for attempt in range(2):
+                conn = self._pool.getconn()
+                try:
+                    self._prepare(conn)
+                    return conn
+                except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                    self._pool.putconn(conn, close=True)
+                    if attempt:
+                        raise
+                except BaseException:
+                    # any other failure: never leak the connection
+                    self._pool.putconn(conn, close=True)
+                    raise
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _prepare(self, conn):
+        """
+        Health check + per-checkout settings in one round trip.
+        """
+        if conn.closed:
+            raise psycopg2.InterfaceError("connection already closed")
+
+        with conn.cursor() as cur:
+            if self.statement_timeout_ms is None:
+                cur.execute("SELECT 1")
+            else:
+                cur.execute("SET LOCAL statement_timeout = %s", (self.statement_timeout_ms,))
+
+    def _release(self, conn, *, failed: bool):
+        try:
+            if failed:
+                conn.rollback()
+            else:
+                conn.commit()
+        except psycopg2.Error:
+            self._pool.putconn(conn, close=True)
+            # a failed commit means the work was lost; a failed rollback
+            # must not mask the error already propagating
+            if not failed:
+                raise
+        else:
+            self._pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    # ---------- public API ----------
+
+    @contextmanager
+    def connection(self):
+        bound = getattr(self._local, "conn", None)
+        if bound is not None:
+            # inside transaction(): join it, commit happens there
+            yield bound
+            return
+
+        conn = self._checkout()
+        failed = True
+        try:
+            yield conn
+            failed = False
+        finally:
+            self._release(conn, failed=failed)
+
+    @contextmanager
+    def transaction(self):
+        if getattr(self._local, "conn", None) is not None:
+            # nested: the outermost block owns commit / rollback
+            yield self._local.conn
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
+        self._local.callbacks = []
+        failed = True
+        try:
+            yield conn
+            failed = False
+        finally:
+            callbacks, self._local.callbacks = self._local.callbacks, []
+            self._local.conn = None
+            self._release(conn, failed=failed)
+
+        # only reached once the commit went through
+        for callback in callbacks:
+            callback()
+
+    def after_commit(self, callback):
+        """
+        Run `callback` after the current thread's transaction() commits
+        (dropped on rollback), or right away outside a transaction.
+        """
+        if getattr(self._local, "conn", None) is None:
+            callback()
+            return
+        self._local.callbacks.append(callback)
+
+    def close(self):
+        self._pool.closeall()
+
+
+_default_pool: ConnectionPool | None = None
+_default_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """
+    Process-wide pool for the main database, created on first use.
+    """
+    global _default_pool
+
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool(dbname="rag_app")
+        return _default_pool
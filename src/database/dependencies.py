@@ -1,6 +1,11 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import os
 from langchain_community.vectorstores import PGVector
 
+from src.database.embedding_cache import CachedEmbedder
+from src.util.lazy import Lazy
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
 def create_vectorstore():
     embedder = create_embedder()
 
@@ -12,9 +17,22 @@ def create_vectorstore():
 
     return vectorstore
 
-def create_embedder():
-    embedder = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+def _load_model():
+    # deferred: importing sentence-transformers / torch dominates startup
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
 
-    return embedder
+def create_embedder(*, cache: bool = True):
+    if not cache:
+        return _load_model()
+
+    # the model is only loaded on the first cache miss
+    embedder = Lazy("embedding model", _load_model)
+
+    return CachedEmbedder(
+        embedder=embedder,
+        model_name=EMBEDDING_MODEL,
+        path=os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite"),
+    )
 
-    
\ No newline at end of file
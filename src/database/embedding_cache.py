@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbedder(Embeddings):
+    """
+    Content-addressed embedding cache wrapped around any LangChain embedder.
+
+    Keys are (model_name, sha256(text)). Lookups go through an in-memory
+    LRU tier first, then a SQLite table of float32 blobs on disk; only
+    misses reach the wrapped model, in one embed_documents batch.
+    """
+
+    def __init__(
+        self,
+        *,
+        embedder: Embeddings,
+        model_name: str,
+        path: str,
+        max_memory_items: int = 50_000,
+    ):
+        self.embedder = embedder
+        self.model_name = model_name
+        self.path = path
+        self.max_memory_items = max_memory_items
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, hash)
+            )
+            """
+        )
+        self._db.commit()
+
+    # ---------- Embeddings API ----------
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        keys = [self._key(t) for t in texts]
+        found = self._lookup(set(keys))
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        missed = sum(1 for k in keys if k in missing)
+        with self._lock:
+            self.hits += len(keys) - missed
+            self.misses += missed
+
+        if missing:
+            vectors = self.embedder.embed_documents(list(missing.values()))
+            new = dict(zip(missing.keys(), vectors))
+            self._store(new)
+            found.update(new)
+
+        return [list(found[k]) for k in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        found = self._lookup({key})
+
+        if key in found:
+            with self._lock:
+                self.hits += 1
+            return list(found[key])
+
+        with self._lock:
+            self.misses += 1
+
+        vector = self.embedder.embed_query(text)
+        self._store({key: vector})
+        return vector
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_items": len(self._memory),
+            }
+
+    # ---------- internals ----------
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: set[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+            pending = [k for k in keys if k not in found]
+            if not pending:
+                return found
+
+            # chunk to stay under SQLite's bound-parameter limit
+            for i in range(0, len(pending), 500):
+                batch = pending[i:i + 500]
+                rows = self._db.execute(
+                    f"""
+                    SELECT hash, vector FROM embeddings
+                    WHERE model = ? AND hash IN ({", ".join("?" * len(batch))})
+                    """,
+                    (self.model_name, *batch),
+                ).fetchall()
+
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                    found[key] = vector
+                    self._remember(key, vector)
+
+        return found
+
+    def _store(self, vectors: dict[str, list[float]]):
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [
+                    (self.model_name, key, np.asarray(vec, dtype=np.float32).tobytes())
+                    for key, vec in vectors.items()
+                ],
+            )
+            self._db.commit()
+
+            for key, vec in vectors.items():
+                self._remember(key, list(vec))
+
+    def _remember(self, key: str, vector: list[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
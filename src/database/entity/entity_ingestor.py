@@ -1,3 +1,6 @@
+from src.database.db import to_vector
+
+
 class EntityIngestor:
     def __init__(self, *, entity_store, embedder):
         self.entity_store = entity_store
@@ -61,7 +64,7 @@ class EntityIngestor:
                 e["embedding_text"],   # variant text
                 e["source_table"],
                 e["source_column"],
-                emb,
+                to_vector(emb),
             )
             for e, emb in zip(expanded, embeddings)
         ]
@@ -1,10 +1,26 @@
+from src.database.db import to_vector
+from src.database import quantization as quant
 from src.database.entity.entity_store import EntityStore
 
 
 class EntityRetriever:
-    def __init__(self, *, entity_store, embedder):
+    def __init__(
+        self,
+        *,
+        entity_store,
+        embedder,
+        quantization: str | None = None,
+        rerank_factor: int = 4,
+        dim: int = quant.EMBEDDING_DIM,
+    ):
+        quant.validate(quantization)
+
         self.entity_store:EntityStore = entity_store
         self.embedder = embedder
+        # "halfvec" | "bit": shortlist on the compact index, re-rank exactly
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self.dim = dim
         self.version = "0.0.4"
 
     def retrieve(
@@ -43,7 +59,8 @@ class EntityRetriever:
         Behavior
         --------
         - Normalizes input to a list internally
-        - Performs similarity search per entity
+        - Embeds all surface forms in one batch
+        - Resolves all entities in one similarity search round trip
         - Adds `resolved` field in-place
 
         Output Mutation
@@ -62,65 +79,113 @@ class EntityRetriever:
         is_single = isinstance(queries, dict)
         query_list = [queries] if is_single else queries
 
-        for q in query_list:
-            surface_form = q["surface_form"]
-            entity_type = q["entity_type"]
+        if not query_list:
+            return query_list
 
-            embedding = self.embedder.embed_query(surface_form)
+        embeddings = self.embedder.embed_documents(
+            [q["surface_form"] for q in query_list]
+        )
 
-            rows = self._similarity_search(entity_type, embedding, hard_k)
-            filtered = self._apply_soft_hard(rows, soft_k, threshold)
+        rows_by_query = self._similarity_search(
+            [q["entity_type"] for q in query_list],
+            embeddings,
+            hard_k,
+        )
 
-            q["resolved"] = filtered
+        for i, q in enumerate(query_list):
+            rows = rows_by_query.get(i, [])
+            q["resolved"] = self._apply_soft_hard(rows, soft_k, threshold)
 
         return query_list
 
 
 
 
-    def _similarity_search(self, entity_type, embedding, hard_k):
+    def _similarity_search(self, entity_types, embeddings, hard_k):
         """
-            Perform raw vector similarity search.
+            Perform raw vector similarity search for many entities at once.
 
             Input
             -----
-            entity_type : str
-                Logical entity type to constrain search.
-            embedding : list[float]
-                Vector representation of the query surface form.
+            entity_types : list[str]
+                Logical entity type per query, constrains its search.
+            embeddings : list[list[float]]
+                Vector representation of each query surface form.
             hard_k : int
-                Maximum number of nearest neighbors to retrieve.
+                Maximum number of nearest neighbors per query.
 
             Behavior
             --------
-            - Queries entity_embeddings using cosine distance
-            - Orders by closest vectors
-            - Limits results to hard_k
+            - Unnests all query vectors into one statement
+            - Runs a LATERAL top-k per query using cosine distance
+              (shortlisted on the quantized index first if configured)
+            - Orders each query's rows by closest vectors
 
             Returns
             -------
-            list[tuple]
-                [
-                    (entity_id, source_table, similarity_score)
-                ]
+            dict[int, list[tuple]]
+                {
+                    query_index: [
+                        (entity_id, surface_form, source_table, source_column, similarity_score)
+                    ]
+                }
             """
 
-        sql = """
+        coarse = quant.coarse_distance(
+            "e.embedding", "q.embedding", quantization=self.quantization, dim=self.dim
+        )
+        candidates = hard_k * self.rerank_factor if self.quantization else hard_k
+
+        sql = f"""
         SELECT
-            entity_id,
-            surface_form,
-            source_table,
-            source_column,
-            1 - (embedding <=> %s::vector) AS similarity
-        FROM entity_embeddings
-        WHERE entity_type = %s
-        ORDER BY embedding <=> %s::vector
-        LIMIT %s
+            q.idx,
+            nearest.entity_id,
+            nearest.surface_form,
+            nearest.source_table,
+            nearest.source_column,
+            1 - nearest.distance AS similarity
+        FROM unnest(%s::int[], %s::text[], %s::vector[]) AS q(idx, entity_type, embedding)
+        CROSS JOIN LATERAL (
+            SELECT
+                entity_id,
+                surface_form,
+                source_table,
+                source_column,
+                embedding <=> q.embedding AS distance
+            FROM (
+                SELECT
+                    e.entity_id,
+                    e.surface_form,
+                    e.source_table,
+                    e.source_column,
+                    e.embedding
+                FROM entity_embeddings e
+                WHERE e.entity_type = q.entity_type
+                ORDER BY {coarse}
+                LIMIT %s
+            ) candidates
+            ORDER BY distance
+            LIMIT %s
+        ) nearest
+        ORDER BY q.idx, nearest.distance
         """
-        return self.entity_store.execute_read(
-            sql, (embedding, entity_type, embedding, hard_k)
+        rows = self.entity_store.execute_read(
+            sql,
+            (
+                list(range(len(entity_types))),
+                list(entity_types),
+                [to_vector(e) for e in embeddings],
+                candidates,
+                hard_k,
+            ),
         )
 
+        grouped: dict[int, list[tuple]] = {}
+        for idx, *row in rows:
+            grouped.setdefault(idx, []).append(tuple(row))
+
+        return grouped
+
     def _apply_soft_hard(self, rows, soft_k, threshold):
         """
         Apply soft-k and similarity threshold filtering.
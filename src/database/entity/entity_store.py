@@ -1,10 +1,11 @@
-from psycopg import Connection
 from typing import Iterable, Sequence
 
+from src.database.db import ConnectionPool
+
 
 class EntityStore:
-    def __init__(self, conn: Connection):
-        self.conn = conn
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
 
     def execute_read(
         self,
@@ -14,7 +15,7 @@ class EntityStore:
         """
         Execute a SELECT query.
         """
-        with self.conn.cursor() as cur:
+        with self.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(sql, params)
             return cur.fetchall()
 
@@ -31,7 +32,7 @@ class EntityStore:
         - tuple / sequence     -> execute(sql, params)
         - iterable of tuples   -> executemany(sql, params)
         """
-        with self.conn.cursor() as cur:
+        with self.pool.connection() as conn, conn.cursor() as cur:
             if params is None:
                 cur.execute(sql)
                 return cur.rowcount
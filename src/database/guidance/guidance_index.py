@@ -0,0 +1,93 @@
+import threading
+
+import numpy as np
+
+from src.database.db import from_vector
+from src.models.guidance import GuidanceIngest
+
+
+class GuidanceIndex:
+    """
+    In-memory copy of all active guidance embeddings.
+
+    One matrix holds every row; a single matmul per query embedding scores
+    all guidance types at once. Distances are L2, same as
+    GuidanceStore.similarity_search, so rankings and similarity values
+    match the SQL path. The index reloads itself whenever
+    GuidanceStore.version changes (ingest / truncate).
+    """
+
+    def __init__(self, *, guidance_store):
+        self.guidance_store = guidance_store
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._rows: list[tuple] = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._by_type: dict[str, np.ndarray] = {}
+
+    def _ensure_loaded(self):
+        version = self.guidance_store.version
+        if self._version == version:
+            return
+
+        rows = self.guidance_store.load_all()
+
+        by_type: dict[str, list[int]] = {}
+        for i, row in enumerate(rows):
+            by_type.setdefault(row[2], []).append(i)
+
+        if rows:
+            matrix = np.vstack([from_vector(row[5]) for row in rows])
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+
+        self._rows = [row[:5] for row in rows]
+        self._matrix = matrix
+        self._sq_norms = np.einsum("ij,ij->i", matrix, matrix) if rows else np.empty(0, dtype=np.float32)
+        self._by_type = {t: np.asarray(idx) for t, idx in by_type.items()}
+        self._version = version
+
+    def search(
+        self,
+        *,
+        query_embedding: list[float],
+        types: dict[str, int],
+    ) -> dict[str, list[GuidanceIngest]]:
+        """
+        types: {guidance_type: k}
+        Returns {guidance_type: [GuidanceIngest, ...]} nearest first.
+        """
+        with self._lock:
+            self._ensure_loaded()
+
+            results: dict[str, list[GuidanceIngest]] = {t: [] for t in types}
+            if not self._rows:
+                return results
+
+            q = np.asarray(query_embedding, dtype=np.float32)
+            sq_dist = self._sq_norms + q @ q - 2.0 * (self._matrix @ q)
+            distances = np.sqrt(np.maximum(sq_dist, 0.0))
+
+            for t, k in types.items():
+                idx = self._by_type.get(t)
+                if idx is None or k <= 0:
+                    continue
+
+                order = idx[np.argsort(distances[idx], kind="stable")[:k]]
+
+                for i in order:
+                    gid, name, gtype, priority, content = self._rows[i]
+                    results[t].append(
+                        GuidanceIngest(
+                            id=gid,
+                            name=name,
+                            type=gtype,
+                            priority=priority,
+                            content=content,
+                            similarity=1.0 / (1.0 + float(distances[i])),
+                        )
+                    )
+
+            return results
@@ -1,10 +1,12 @@
+from src.database.guidance.guidance_index import GuidanceIndex
 from src.models.guidance import GuidanceIngest
 
 
 class GuidanceRetriever:
-    def __init__(self, *, guidance_store, embedder):
+    def __init__(self, *, guidance_store, embedder, in_memory: bool = False):
         self.guidance_store = guidance_store
         self.embedder = embedder
+        self.index = GuidanceIndex(guidance_store=guidance_store) if in_memory else None
 
     def retrieve(
         self,
@@ -15,14 +17,61 @@ class GuidanceRetriever:
         hard_k: int = 8,
         min_similarity: float = 0.65,
     ) -> list[GuidanceIngest]:
+        return self.retrieve_many(
+            query=query,
+            types={
+                type: {
+                    "soft_k": soft_k,
+                    "hard_k": hard_k,
+                    "min_similarity": min_similarity,
+                }
+            },
+        )[type]
+
+    def retrieve_many(
+        self,
+        *,
+        query: str,
+        types: dict[str, dict],
+    ) -> dict[str, list[GuidanceIngest]]:
+        """
+        Retrieve several guidance types for one query with a single
+        embedding. `types` maps guidance type -> optional
+        {soft_k, hard_k, min_similarity} overrides.
+        """
         query_embedding = self.embedder.embed_query(query)
 
-        candidates = self.guidance_store.similarity_search(
-            query_embedding=query_embedding,
-            type=type,
-            k=hard_k,
-        )
+        options = {
+            t: {"soft_k": 5, "hard_k": 8, "min_similarity": 0.65, **(opts or {})}
+            for t, opts in types.items()
+        }
 
+        if self.index is not None:
+            candidates = self.index.search(
+                query_embedding=query_embedding,
+                types={t: o["hard_k"] for t, o in options.items()},
+            )
+        else:
+            candidates = {
+                t: self.guidance_store.similarity_search(
+                    query_embedding=query_embedding,
+                    type=t,
+                    k=o["hard_k"],
+                )
+                for t, o in options.items()
+            }
+
+        return {
+            t: self._select(candidates[t], o["soft_k"], o["min_similarity"])
+            for t, o in options.items()
+        }
+
+    def _select(
+        self,
+        candidates: list[GuidanceIngest],
+        soft_k: int,
+        min_similarity: float,
+    ) -> list[GuidanceIngest]:
         selected: list[GuidanceIngest] = []
 
         for idx, item in enumerate(candidates):
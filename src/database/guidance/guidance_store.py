@@ -1,21 +1,43 @@
 import json
 from psycopg2.extras import execute_values
 
+from src.database.db import to_vector
+from src.database import quantization as quant
 from src.models.guidance import GuidanceIngest
 
 class GuidanceStore:
-    def __init__(self, *, conn):
-        self.conn = conn
+    def __init__(
+        self,
+        *,
+        pool,
+        quantization: str | None = None,
+        rerank_factor: int = 4,
+        dim: int = quant.EMBEDDING_DIM,
+    ):
+        quant.validate(quantization, metric="l2")
+
+        self.pool = pool
+        # "halfvec" | "bit": shortlist on the compact index, re-rank exactly
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self.dim = dim
+        # bumped after every committed write so in-memory indexes know to reload
+        self.version = 0
+
+    def _bump_version(self):
+        self.version += 1
 
     def truncate(self):
         query = """
         TRUNCATE TABLE guidance, guidance_embeddings CASCADE
         """
-        with self.conn.cursor() as cur:
+        with self.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(query)
 
+        self.pool.after_commit(self._bump_version)
+
     def ingest(self, *, items: list[GuidanceIngest]) -> list[GuidanceIngest]:
-        with self.conn.cursor() as cur:
+        with self.pool.connection() as conn, conn.cursor() as cur:
             # 1. prepare db objects
             guidance_objects = [i.to_db_dict() for i in items]
 
@@ -48,9 +70,9 @@ class GuidanceStore:
 
             # 5. insert embeddings
             embed_rows = [
-                (i.id, i.embedding, i.embedding_text, True)
+                (i.id, to_vector(i.embedding), i.embedding_text, True)
                 for i in items
-                if i.embedding and i.embedding_text
+                if i.embedding is not None and i.embedding_text
             ]
 
             if embed_rows:
@@ -64,17 +86,15 @@ class GuidanceStore:
                     embed_rows
                 )
 
+        self.pool.after_commit(self._bump_version)
         return items
 
-
-    def similarity_search(
-        self,
-        *,
-        query_embedding: list[float],
-        type: str,
-        k: int = 5
-    ) -> list[GuidanceIngest]:
-        with self.conn.cursor() as cur:
+    def load_all(self) -> list[tuple]:
+        """
+        All active guidance embeddings:
+        [(id, name, type, priority, content, embedding)]
+        """
+        with self.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(
                 """
                 SELECT
@@ -83,16 +103,54 @@ class GuidanceStore:
                     g.type,
                     g.priority,
                     g.content,
-                    ge.embedding <-> %s::vector AS distance
+                    ge.embedding
                 FROM guidance_embeddings ge
                 JOIN guidance g ON g.id = ge.guidance_id
-                WHERE g.type = %s
-                AND g.active = true
+                WHERE g.active = true
                 AND ge.active = true
-                ORDER BY ge.embedding <-> %s::vector
-                LIMIT %s
+                """
+            )
+            return cur.fetchall()
+
+
+    def similarity_search(
+        self,
+        *,
+        query_embedding: list[float],
+        type: str,
+        k: int = 5
+    ) -> list[GuidanceIngest]:
+        vec = to_vector(query_embedding)
+        coarse = quant.coarse_distance(
+            "ge.embedding", "%(vec)s::vector", quantization=self.quantization, dim=self.dim, metric="l2"
+        )
+        # without quantization the shortlist is already the exact top-k
+        candidates = k * self.rerank_factor if self.quantization else k
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT id, name, type, priority, content, embedding <-> %(vec)s::vector AS distance
+                FROM (
+                    SELECT
+                        g.id,
+                        g.name,
+                        g.type,
+                        g.priority,
+                        g.content,
+                        ge.embedding
+                    FROM guidance_embeddings ge
+                    JOIN guidance g ON g.id = ge.guidance_id
+                    WHERE g.type = %(type)s
+                    AND g.active = true
+                    AND ge.active = true
+                    ORDER BY {coarse}
+                    LIMIT %(candidates)s
+                ) candidates
+                ORDER BY distance
+                LIMIT %(k)s
                 """,
-                (query_embedding, type, query_embedding, k)
+                {"vec": vec, "type": type, "candidates": candidates, "k": k}
             )
             rows = cur.fetchall()
 
@@ -0,0 +1,82 @@
+"""
+SQL helpers for compact (quantized) embedding search with pgvector.
+
+Embeddings stay stored as full float32 `vector` columns; the compact
+representation lives only in an expression index:
+
+    halfvec -> (embedding::halfvec(dim))          2 bytes / dim
+    bit     -> (binary_quantize(embedding)::bit(dim))   1 bit / dim
+
+A quantized search orders candidates by the compact distance (so the
+expression index is used), keeps `k * rerank_factor` of them and re-ranks
+those exactly against the full `vector` column.
+
+The expression indexes are opt-in (migrations/optional/ or
+VectorStore.create_index(quantization=...)); create them only where a
+store is configured with that quantization.
+"""
+
+QUANTIZATIONS = ("halfvec", "bit")
+METRICS = ("cosine", "l2")
+
+# sentence-transformers/all-MiniLM-L6-v2
+EMBEDDING_DIM = 384
+
+_OPERATORS = {"cosine": "<=>", "l2": "<->"}
+
+
+def validate(quantization: str | None, metric: str = "cosine"):
+    if quantization is not None and quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unsupported quantization: {quantization}")
+    if metric not in METRICS:
+        raise ValueError(f"Unsupported metric: {metric}")
+
+
+def exact_distance(column: str, query: str, *, metric: str = "cosine") -> str:
+    return f"{column} {_OPERATORS[metric]} {query}"
+
+
+def coarse_distance(
+    column: str,
+    query: str,
+    *,
+    quantization: str | None,
+    dim: int = EMBEDDING_DIM,
+    metric: str = "cosine",
+) -> str:
+    """
+    Distance expression that matches index_expression(), so the planner
+    can use the quantized index. `query` is any SQL expression of type
+    vector (a bound `%s::vector` or a column).
+    """
+    dim = int(dim)
+
+    if quantization == "halfvec":
+        return f"{column}::halfvec({dim}) {_OPERATORS[metric]} ({query})::halfvec({dim})"
+
+    if quantization == "bit":
+        # hamming distance regardless of metric: only used to shortlist
+        return f"binary_quantize({column})::bit({dim}) <~> binary_quantize({query})::bit({dim})"
+
+    return exact_distance(column, query, metric=metric)
+
+
+def index_expression(
+    column: str,
+    *,
+    quantization: str | None,
+    dim: int = EMBEDDING_DIM,
+    metric: str = "cosine",
+) -> str:
+    """
+    `(expression) opclass` for CREATE INDEX ... USING hnsw / ivfflat.
+    """
+    dim = int(dim)
+
+    if quantization == "halfvec":
+        return f"(({column}::halfvec({dim})) halfvec_{metric}_ops)"
+
+    if quantization == "bit":
+        return f"((binary_quantize({column})::bit({dim})) bit_hamming_ops)"
+
+    return f"({column} vector_{metric}_ops)"
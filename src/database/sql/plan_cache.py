@@ -0,0 +1,182 @@
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+# words that end up as bound literals or operators in the generated SQL
+_LITERAL_WORDS = frozenset(
+    "monday tuesday wednesday thursday friday saturday sunday "
+    "mon tue tues wed thu thur thurs fri sat sun weekend weekday "
+    "january february march april may june july august september october "
+    "november december jan feb mar apr jun jul aug sep sept oct nov dec "
+    "today tomorrow yesterday tonight morning afternoon evening night noon "
+    "am pm week month year semester "
+    "before after above below over under between more less fewer least most "
+    "first last next previous earliest latest not no without".split()
+)
+
+
+def literal_tokens(query: str) -> frozenset[str]:
+    """
+    Tokens of a question that become bound literals in its SQL: numbers,
+    codes and times (anything with a digit), days, months, relative dates
+    and comparison words. Two questions with different literal tokens
+    must not share a plan; every other word is left to the embedding.
+    """
+    return frozenset(
+        w for w in _WORD.findall(query.lower())
+        if w in _LITERAL_WORDS or any(c.isdigit() for c in w)
+    )
+
+
+@dataclass
+class SQLPlan:
+    query: str
+    normalized: dict
+    # one entry per normalized sub-query: (resolved sub-query, sql objects)
+    steps: list[tuple[dict, list[dict]]]
+    created_at: float
+    literals: frozenset[str] = field(default_factory=frozenset)
+
+
+class PlanCache:
+    """
+    Semantic cache of NL-to-SQL plans keyed by query embedding.
+
+    A lookup hits when the cosine similarity to a cached query is at least
+    `threshold` AND both questions have the same literal tokens (see
+    literal_tokens) AND every entity surface form of the cached plan also
+    appears in the new query. Embedding similarity alone would let
+    "classes on monday" reuse the SQL (and bound literals) of "classes on
+    tuesday"; paraphrases ("who teaches cloud computing" / "cloud
+    computing is taught by whom") still share a plan.
+
+    Entries expire after `ttl` seconds, the cache holds at most `max_size`
+    plans (oldest evicted first) and is cleared whenever the guidance
+    version it was built against changes.
+    """
+
+    def __init__(self, *, threshold: float = 0.92, ttl: float = 3600.0, max_size: int = 512):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._plans: list[SQLPlan] = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    def get(self, *, query: str, embedding: list[float], version) -> SQLPlan | None:
+        with self._lock:
+            self._check_version(version)
+            self._expire()
+
+            plan = self._nearest(query, embedding)
+
+            if plan is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            return plan
+
+    def put(self, *, query: str, embedding: list[float], version, normalized: dict, steps: list):
+        with self._lock:
+            self._check_version(version)
+            self._expire()
+
+            while len(self._plans) >= self.max_size:
+                self._remove(0)
+                self.evictions += 1
+
+            self._plans.append(
+                SQLPlan(
+                    query=query,
+                    normalized=normalized,
+                    steps=steps,
+                    created_at=time.monotonic(),
+                    literals=literal_tokens(query),
+                )
+            )
+
+            vec = self._normalize(embedding)
+            if self._matrix.size:
+                self._matrix = np.vstack([self._matrix, vec])
+            else:
+                self._matrix = vec[None, :]
+
+    def clear(self):
+        with self._lock:
+            self._plans = []
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._plans),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    # ---------- internals ----------
+
+    def _nearest(self, query: str, embedding: list[float]) -> SQLPlan | None:
+        if not self._plans:
+            return None
+
+        scores = self._matrix @ self._normalize(embedding)
+        text = query.lower()
+        literals = literal_tokens(query)
+
+        for i in np.argsort(-scores):
+            if scores[i] < self.threshold:
+                break
+
+            plan = self._plans[i]
+            if plan.literals != literals:
+                continue
+
+            if all(value.lower() in text for value in self._surface_forms(plan)):
+                return plan
+
+        return None
+
+    def _surface_forms(self, plan: SQLPlan) -> list[str]:
+        return [
+            str(entity["raw_value"])
+            for q in plan.normalized.get("queries", [])
+            for entity in q.get("entities", [])
+            if entity.get("raw_value")
+        ]
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._plans = []
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+            self._version = version
+
+    def _expire(self):
+        now = time.monotonic()
+        # plans are appended in creation order, so expired ones are a prefix
+        while self._plans and now - self._plans[0].created_at > self.ttl:
+            self._remove(0)
+
+    def _remove(self, i: int):
+        del self._plans[i]
+        self._matrix = np.delete(self._matrix, i, axis=0)
+
+    def _normalize(self, embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
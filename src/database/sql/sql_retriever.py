@@ -1,18 +1,37 @@
 import json
 import re
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
 from src.database.sql.prompts.retriever_prompt import build_generation_prompt, build_normalization_prompt
 from src.models.guidance import GuidanceIngest
 from src.models.user import User
 from src.database.guidance.guidance_retriever import GuidanceRetriever
+from src.database.sql.plan_cache import PlanCache, SQLPlan
+from src.util.deadline_executor import DeadlineExecutor
 
 
 class SQLRetriever:
-    def __init__(self, *, guidance_retriever, llm, sql_store, embedder, entity_retriver):
+    def __init__(
+        self,
+        *,
+        guidance_retriever,
+        llm,
+        sql_store,
+        embedder,
+        entity_retriver,
+        plan_cache: PlanCache | None = None,
+        max_workers: int = 4,
+        subquery_timeout: float | None = 30.0,
+    ):
         self.guidance_retriever = guidance_retriever
         self.llm = llm
         self.sql_store = sql_store
         self.embedder = embedder
         self.entity_retriever = entity_retriver
+        self.plan_cache = plan_cache
+        self.subquery_timeout = subquery_timeout
+        # timed-out sub-queries are tracked so stuck runs can't pile up
+        self.executor = DeadlineExecutor(max_workers=max_workers, thread_name_prefix="sql-subquery")
 
     def _get_rules_and_schema(
         self,
@@ -22,11 +41,16 @@ class SQLRetriever:
         rule_k: int,
         schema_k: int,
     ) -> dict:
-        rules: list[GuidanceIngest] = self.guidance_retriever.retrieve(
+        guidance = self.guidance_retriever.retrieve_many(
             query=query,
-            type="realisation_rules"
+            types={
+                "realisation_rules": {},
+                "schema_guidance": {"soft_k": 5},
+            },
         )
 
+        rules: list[GuidanceIngest] = guidance["realisation_rules"]
+
         print("list of rules fetched:")
         for rule in rules:
             print(
@@ -34,12 +58,7 @@ class SQLRetriever:
                 f"distance: {getattr(rule, 'distance', None)}"
             )
 
-        schema: list[GuidanceIngest] = self.guidance_retriever.retrieve(
-            query=query,
-            type="schema_guidance",
-            soft_k=5
-
-        )
+        schema: list[GuidanceIngest] = guidance["schema_guidance"]
 
         print("list of schema fetched:")
         for table in schema:
@@ -265,6 +284,82 @@ class SQLRetriever:
 
         return results
 
+    def _run_subquery(self, *, q: dict, schema: list[str]) -> tuple[list[dict], list[dict]]:
+        generate_rules:list[GuidanceIngest] = self._get_generate_rules(query=q['text'])
+        minimal_generate_rules = [rules.to_prompt_block() for rules in generate_rules]
+
+        sql_objects = self._generate_sql_object(
+            resolved_output=q,
+            schema=schema,
+            generate_rules=minimal_generate_rules
+        )
+
+        if not sql_objects:
+            return [], []
+
+        print(sql_objects)
+
+        return sql_objects, self._run_sql_objects(sql_objects=sql_objects)
+
+    def _guidance_version(self):
+        return getattr(self.guidance_retriever.guidance_store, "version", None)
+
+    def _rebind_params(self, *, sql_objects: list[dict], cached_query: dict, fresh_query: dict) -> list[dict]:
+        """
+        Swap entity ids resolved for the cached plan with the ids the same
+        entities resolve to now.
+        """
+        id_map = {}
+
+        for old, new in zip(cached_query.get("entities", []), fresh_query.get("entities", [])):
+            for old_r, new_r in zip(old.get("resolved", []), new.get("resolved", [])):
+                id_map[str(old_r["entity_id"])] = new_r["entity_id"]
+
+        return [
+            {
+                **obj,
+                "params": [
+                    id_map.get(str(p), p) if isinstance(p, (str, int)) else p
+                    for p in obj.get("params", [])
+                ],
+            }
+            for obj in sql_objects
+        ]
+
+    def _run_plan(self, *, plan: SQLPlan) -> list:
+        """
+        Cache hit: re-resolve entities and execute the cached SQL objects
+        with freshly bound params. No LLM calls.
+        """
+        if plan.normalized.get("skip") is True:
+            print("Plan cache hit: skipping SQL generation (not DB-related query).")
+            return []
+
+        resolved_output = self._resolve_entities(normalized=plan.normalized)
+
+        final_results = []
+
+        for (cached_q, sql_objects), fresh_q in zip(plan.steps, resolved_output.get("queries", [])):
+            if not sql_objects:
+                continue
+
+            rebound = self._rebind_params(
+                sql_objects=sql_objects,
+                cached_query=cached_q,
+                fresh_query=fresh_q,
+            )
+            final_results.append(self._run_sql_objects(sql_objects=rebound))
+
+        return final_results
+
+    def _flatten_rows(self, final_results: list) -> list[dict]:
+        return [
+            row
+            for results in final_results
+            for result in results
+            for row in result["rows"]
+        ]
+
     def retrieve(
     self,
     *,
@@ -278,8 +373,22 @@ class SQLRetriever:
 
         Returns:
         - [] if query is not suitable for SQL
-        - list of SQL objects otherwise
+        - list of result rows (dicts) otherwise
         """
+        query_embedding = None
+
+        if self.plan_cache is not None:
+            query_embedding = self.embedder.embed_query(query)
+            plan = self.plan_cache.get(
+                query=query,
+                embedding=query_embedding,
+                version=self._guidance_version(),
+            )
+
+            if plan is not None:
+                print(f"Plan cache hit: {plan.query}")
+                return self._flatten_rows(self._run_plan(plan=plan))
+
         rules_and_schema = self._get_rules_and_schema(
             query=query,
             user=user,
@@ -304,6 +413,7 @@ class SQLRetriever:
 
         if normalized_result.get("skip") is True:
             print("Skipping SQL generation (not DB-related query).")
+            self._cache_plan(query=query, embedding=query_embedding, normalized=normalized_result, steps=[])
             return []
 
         print("Running resolution...")
@@ -316,28 +426,55 @@ class SQLRetriever:
         print("\n")
 
         final_results = []
+        steps = []
+
+        # sub-queries are independent: generate + run them concurrently,
+        # then reassemble in the original order
+        queries = resolved_output.get("queries", [])
+        futures = [
+            None if self.executor.saturated
+            else self.executor.submit(self._run_subquery, q=q, schema=minimal_schema)
+            for q in queries
+        ]
+        start = time.perf_counter()
+
+        for q, future in zip(queries, futures):
+            if future is None:
+                print(f"⚠️ Sub-query skipped, workers busy with timed-out sub-queries: {q.get('text')}")
+                steps.append((q, []))
+                continue
 
-        for q in resolved_output.get("queries", []):
-            generate_rules:list[GuidanceIngest] = self._get_generate_rules(query=q['text'])
-            minimal_generate_rules = [rules.to_prompt_block() for rules in generate_rules]
-
-            sql_objects = self._generate_sql_object(
-                resolved_output=q,
-                schema=minimal_schema,
-                generate_rules=minimal_generate_rules
-            )
+            remaining = None
+            if self.subquery_timeout is not None:
+                remaining = max(0.0, self.subquery_timeout - (time.perf_counter() - start))
 
-            if not sql_objects:
+            try:
+                sql_objects, rows = future.result(timeout=remaining)
+            except FutureTimeout:
+                self.executor.abandon(future)
+                print(f"⚠️ Sub-query timed out: {q.get('text')}")
+                steps.append((q, []))
+                continue
+            except Exception as e:
+                print(f"⚠️ Sub-query failed: {q.get('text')}: {e}")
+                steps.append((q, []))
                 continue
 
-            print(sql_objects)
+            steps.append((q, sql_objects))
 
-            rows = self._run_sql_objects(sql_objects=sql_objects)
+            if not sql_objects:
+                continue
 
             final_results.append(rows)
 
         print(f"\n\n\nFinal results: {final_results}\n\n\n")
 
+        # don't pin a plan where generation failed for some sub-query
+        if all(sql_objects for _, sql_objects in steps):
+            self._cache_plan(query=query, embedding=query_embedding, normalized=normalized_result, steps=steps)
+
+        return self._flatten_rows(final_results)
+
 
         # generate_rules:list[GuidanceIngest] = self._get_generate_rules(query=query)
 
@@ -361,6 +498,18 @@ class SQLRetriever:
 
         # return sql_rows
     
+    def _cache_plan(self, *, query: str, embedding, normalized: dict, steps: list):
+        if self.plan_cache is None:
+            return
+
+        self.plan_cache.put(
+            query=query,
+            embedding=embedding,
+            version=self._guidance_version(),
+            normalized=normalized,
+            steps=steps,
+        )
+
     def get_row(
         self,
         *,
@@ -1,6 +1,6 @@
 class SQLStore:
-    def __init__(self, conn):
-        self.conn = conn
+    def __init__(self, pool):
+        self.pool = pool
 
     def execute_read(self, sql: str, params: tuple | None = None, limit: int = 100) -> list[dict]:
         """Execute SELECT queries only"""
@@ -14,7 +14,7 @@ class SQLStore:
             sql = f"{sql.rstrip(';')} limit {limit}"
 
         try:
-            with self.conn.cursor() as cur:
+            with self.pool.connection() as conn, conn.cursor() as cur:
                 cur.execute(sql, params or ())
                 columns = [desc[0] for desc in cur.description]
                 rows = cur.fetchall()
@@ -25,7 +25,7 @@ class SQLStore:
 
     def close(self):
         try:
-            self.conn.close()
+            self.pool.close()
         except Exception as e:
             pass
 
@@ -60,7 +60,7 @@ class SQLStore:
         params = [f"%{value}%"] * len(columns)
         params.append(k)
 
-        with self.conn.cursor() as cur:
+        with self.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(sql, params)
             rows = cur.fetchall()
             colnames = [desc[0] for desc in cur.description]
@@ -71,15 +71,12 @@ class SQLStore:
         ]
     
     def execute_write(self, sql: str, params: tuple | None = None):
-        cur = self.conn.cursor()
-        cur.execute(sql, params or ())
-        if "returning" in sql.lower():
-            row = cur.fetchone()
-            cur.close()
-            return row[0]
-        rc = cur.rowcount
-        cur.close()
-        return rc
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, params or ())
+            if "returning" in sql.lower():
+                row = cur.fetchone()
+                return row[0]
+            return cur.rowcount
 
     def truncate_tables(self, tables: list[str]):
         """
@@ -99,10 +96,8 @@ class SQLStore:
         sql = f"TRUNCATE TABLE {table_list} CASCADE;"
 
         try:
-            with self.conn.cursor() as cur:
+            with self.pool.connection() as conn, conn.cursor() as cur:
                 cur.execute(sql)
-            self.conn.commit()
         except Exception as e:
-            self.conn.rollback()
             raise RuntimeError(e)
 
@@ -0,0 +1,242 @@
+import threading
+
+import faiss
+import numpy as np
+
+from src.database.db import from_vector
+from src.database.vector.vector_store import VectorStore
+from src.models.document import StoredChunk, StoredFile
+
+FAISS_KINDS = ("flat", "ivfpq", "hnsw")
+
+
+class FaissVectorIndex:
+    """
+    In-process mirror of vector_chunks embeddings.
+
+    Postgres stays the source of truth: the index only holds normalized
+    embeddings plus the per-chunk access_level / type / source needed to
+    enforce the same filters as VectorStore.similarity_search. Content and
+    metadata for the final top-k are fetched from Postgres by chunk id.
+
+    FAISS ids are positions in `_chunk_ids`. Deleted chunks are tombstoned
+    and excluded by the search selector (HNSW cannot remove vectors);
+    `load()` compacts them away.
+    """
+
+    def __init__(
+        self,
+        *,
+        vector_store: VectorStore,
+        kind: str = "flat",
+        nlist: int = 1024,
+        pq_m: int = 16,
+        hnsw_m: int = 32,
+        ef_search: int = 128,
+        nprobe: int = 16,
+    ):
+        if kind not in FAISS_KINDS:
+            raise ValueError(f"Unsupported FAISS index kind: {kind}")
+
+        self.vector_store = vector_store
+        self.kind = kind
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+
+        self._lock = threading.RLock()
+        self._index = None
+        self._dim = None
+
+        # position i <-> faiss id i
+        self._chunk_ids: list[str] = []
+        self._access_levels = np.empty(0, dtype=np.int32)
+        self._types = np.empty(0, dtype=object)
+        self._alive = np.empty(0, dtype=bool)
+        self._by_source: dict[str, list[int]] = {}
+        self._by_chunk: dict[str, int] = {}
+
+    # ---------- BUILD ----------
+
+    def _build_index(self, dim: int, train: np.ndarray):
+        kind = self.kind
+
+        # IVF-PQ needs enough points to train its codebooks
+        if kind == "ivfpq" and len(train) < max(256, self.nlist):
+            kind = "flat"
+
+        if kind == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = self.ef_search
+            return index
+
+        if kind == "ivfpq":
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFPQ(
+                quantizer, dim, self.nlist, self.pq_m, 8, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(train)
+            index.nprobe = self.nprobe
+            return index
+
+        return faiss.IndexFlatIP(dim)
+
+    def load(self, batch_size: int = 10_000) -> int:
+        """
+        (Re)build the index from every chunk in vector_chunks.
+        """
+        chunk_ids, sources, levels, types, vectors = [], [], [], [], []
+
+        for chunk_id, source, access_level, type, embedding in self.vector_store.iter_embeddings(batch_size):
+            chunk_ids.append(str(chunk_id))
+            sources.append(source)
+            levels.append(access_level)
+            types.append(type)
+            vectors.append(from_vector(embedding))
+
+        with self._lock:
+            self._index = None
+            self._dim = None
+            self._chunk_ids = []
+            self._access_levels = np.empty(0, dtype=np.int32)
+            self._types = np.empty(0, dtype=object)
+            self._alive = np.empty(0, dtype=bool)
+            self._by_source = {}
+            self._by_chunk = {}
+
+            if vectors:
+                matrix = self._normalize(np.vstack(vectors))
+                self._dim = matrix.shape[1]
+                self._index = self._build_index(self._dim, matrix)
+                self._append(chunk_ids, sources, levels, types, matrix)
+
+        return len(chunk_ids)
+
+    # ---------- SYNC ----------
+
+    def add(self, *, chunks: list[StoredChunk], file: StoredFile, type: str = "vector"):
+        """
+        Mirror freshly committed chunks (called after VectorIngestor commits).
+        """
+        if not chunks:
+            return
+
+        matrix = self._normalize(np.vstack([np.asarray(c.embedding, dtype=np.float32) for c in chunks]))
+
+        with self._lock:
+            if self._index is None:
+                self._dim = matrix.shape[1]
+                self._index = self._build_index(self._dim, matrix)
+
+            self._append(
+                [str(c.id) for c in chunks],
+                [file.source] * len(chunks),
+                [file.access_level] * len(chunks),
+                [type] * len(chunks),
+                matrix,
+            )
+
+    def remove_source(self, source: str) -> int:
+        """
+        Drop every chunk of a file source (mirrors VectorStore.delete_file).
+        """
+        with self._lock:
+            ids = self._by_source.pop(source, [])
+            if not ids:
+                return 0
+
+            self._alive[ids] = False
+            for i in ids:
+                self._by_chunk.pop(self._chunk_ids[i], None)
+
+        return len(ids)
+
+    def remove_chunks(self, chunk_ids: list[str]) -> int:
+        """
+        Drop individual chunks (incremental re-ingestion of a source).
+        """
+        with self._lock:
+            ids = [
+                i for i in (self._by_chunk.pop(str(c), None) for c in chunk_ids)
+                if i is not None
+            ]
+            if ids:
+                self._alive[ids] = False
+
+        return len(ids)
+
+    def set_access_level(self, chunk_ids: list[str], access_level: int) -> int:
+        """
+        Re-label chunks whose file changed access level (VectorStore.update_file_access).
+        """
+        with self._lock:
+            ids = [i for i in (self._by_chunk.get(str(c)) for c in chunk_ids) if i is not None]
+            if ids:
+                self._access_levels[ids] = access_level
+
+        return len(ids)
+
+    def _append(self, chunk_ids, sources, levels, types, matrix):
+        start = len(self._chunk_ids)
+        ids = range(start, start + len(chunk_ids))
+
+        self._index.add(matrix)
+
+        self._chunk_ids.extend(chunk_ids)
+        self._access_levels = np.concatenate([self._access_levels, np.asarray(levels, dtype=np.int32)])
+        self._types = np.concatenate([self._types, np.asarray(types, dtype=object)])
+        self._alive = np.concatenate([self._alive, np.ones(len(chunk_ids), dtype=bool)])
+
+        for i, source, chunk_id in zip(ids, sources, chunk_ids):
+            self._by_source.setdefault(source, []).append(i)
+            self._by_chunk[chunk_id] = i
+
+    # ---------- SEARCH ----------
+
+    def search(
+        self,
+        query_embedding: list[float],
+        k: int,
+        min_access_level: int,
+        type: str = "vector",
+    ) -> list[tuple[str, float]]:
+        """
+        Returns [(chunk_id, cosine_similarity)] best first, restricted to
+        chunks with access_level >= min_access_level and the given type.
+        """
+        with self._lock:
+            if self._index is None:
+                return []
+
+            allowed = np.flatnonzero(
+                self._alive
+                & (self._access_levels >= min_access_level)
+                & (self._types == type)
+            )
+            if len(allowed) == 0:
+                return []
+
+            selector = faiss.IDSelectorBatch(allowed.astype(np.int64))
+
+            if self.kind == "hnsw":
+                params = faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+            elif isinstance(self._index, faiss.IndexIVF):
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+            else:
+                params = faiss.SearchParameters(sel=selector)
+
+            query = self._normalize(np.asarray([query_embedding], dtype=np.float32))
+            scores, ids = self._index.search(query, min(k, len(allowed)), params=params)
+
+            return [
+                (self._chunk_ids[i], float(score))
+                for i, score in zip(ids[0].tolist(), scores[0].tolist())
+                if i >= 0
+            ]
+
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        faiss.normalize_L2(matrix)
+        return matrix
@@ -0,0 +1,68 @@
+import json
+
+FILTER_OPERATORS = ("$eq", "$in", "$exists")
+
+
+def compile_metadata_filter(metadata_filter: dict | None, column: str = "c.metadata") -> tuple[str, list]:
+    """
+    Compile a chunk metadata filter into a parameterized SQL predicate.
+
+        {"faculty_id": 12}                          equality
+        {"chunk_type": {"$eq": "subjects"}}         equality
+        {"chunk_type": {"$in": ["core", "subjects"]}}
+        {"email": {"$exists": True}}
+
+    Keys are ANDed. Every predicate is a `@>` containment or `@?` jsonpath
+    test, so all of them are served by one GIN (jsonb_path_ops) index on
+    the metadata column. Returns ("", []) for an empty filter.
+    """
+    if not metadata_filter:
+        return "", []
+
+    equals: dict = {}
+    clauses: list[str] = []
+    params: list = []
+
+    for key, condition in metadata_filter.items():
+        if not isinstance(key, str) or not key:
+            raise ValueError(f"Invalid metadata filter key: {key!r}")
+
+        if not isinstance(condition, dict):
+            equals[key] = condition
+            continue
+
+        for op, value in condition.items():
+            if op == "$eq":
+                equals[key] = value
+
+            elif op == "$in":
+                if not isinstance(value, (list, tuple, set)) or not value:
+                    raise ValueError(f"$in for {key!r} needs a non-empty list")
+                clauses.append("(" + " OR ".join([f"{column} @> %s::jsonb"] * len(value)) + ")")
+                params.extend(_json({key: v}) for v in value)
+
+            elif op == "$exists":
+                negate = "" if value else "NOT "
+                clauses.append(f"{negate}{column} @? %s::jsonpath")
+                params.append(_json_path(key))
+
+            else:
+                raise ValueError(
+                    f"Unsupported metadata filter operator: {op} (expected one of {FILTER_OPERATORS})"
+                )
+
+    if equals:
+        # all equalities collapse into a single containment test
+        clauses.insert(0, f"{column} @> %s::jsonb")
+        params.insert(0, _json(equals))
+
+    return " AND ".join(clauses), params
+
+
+def _json(value) -> str:
+    return json.dumps(value, default=str)
+
+
+def _json_path(key: str) -> str:
+    escaped = key.replace("\\", "\\\\").replace('"', '\\"')
+    return f'$."{escaped}"'
@@ -0,0 +1,89 @@
+import numpy as np
+
+
+def mmr_select(
+    query_embedding,
+    embeddings,
+    k: int,
+    *,
+    lambda_mult: float = 0.5,
+    groups: list | None = None,
+    max_per_group: int | None = None,
+    relevance=None,
+) -> list[int]:
+    """
+    Maximal marginal relevance over candidate embeddings.
+
+    Picks k indices greedily, each maximizing
+        lambda * sim(query, c) - (1 - lambda) * max sim(c, already picked)
+    with cosine similarity. The candidate-candidate similarity matrix is
+    computed once and the running "max sim to picked" is updated with one
+    vector op per pick, so selection is O(n * k) after an (n x n) matmul
+    (trivial for n = 50).
+
+    relevance: optional per-candidate relevance (e.g. a fused hybrid
+    score) used instead of sim(query, c). It is min-max scaled to [0, 1]
+    so it is comparable with the cosine redundancy term.
+
+    groups / max_per_group: cap per group, e.g. at most 2 chunks per
+    faculty_id. Candidates of a full group are deferred, not dropped:
+    once every other candidate is used up, picking continues without the
+    cap so k results are returned whenever n >= k.
+    lambda_mult = 1.0 with a cap gives plain top-k with a diversity cap.
+    """
+    n = len(embeddings)
+    if n == 0 or k <= 0:
+        return []
+
+    matrix = _normalize(np.asarray(embeddings, dtype=np.float32))
+    query = _normalize(np.asarray(query_embedding, dtype=np.float32)[None, :])[0]
+
+    if relevance is None:
+        relevance = matrix @ query
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+        span = relevance.max() - relevance.min()
+        relevance = (relevance - relevance.min()) / span if span > 0 else np.ones(n, dtype=np.float32)
+    similarity = matrix @ matrix.T
+
+    capped = max_per_group is not None and groups is not None
+    if capped:
+        group_ids = np.asarray([str(g) if g is not None else None for g in groups], dtype=object)
+
+    unpicked = np.ones(n, dtype=bool)
+    available = unpicked.copy()
+    max_sim = np.zeros(n, dtype=np.float32)
+    counts: dict = {}
+    picked: list[int] = []
+
+    while len(picked) < k and unpicked.any():
+        if not available.any():
+            # every remaining candidate is in a full group: backfill
+            capped = False
+            available = unpicked.copy()
+
+        if picked:
+            scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_sim
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+
+        best = int(np.argmax(scores))
+        picked.append(best)
+        unpicked[best] = False
+        available[best] = False
+        max_sim = np.maximum(max_sim, similarity[best])
+
+        if capped and groups[best] is not None:
+            group = group_ids[best]
+            counts[group] = counts.get(group, 0) + 1
+            if counts[group] >= max_per_group:
+                available &= group_ids != group
+
+    return picked
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
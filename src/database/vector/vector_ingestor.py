@@ -1,53 +1,202 @@
 # src/pipelines/vector_ingestion.py
 
+import json
+import time
+from dataclasses import replace
 from uuid import UUID, uuid4
-from typing import List
+from typing import Callable, Iterable, List
 from langchain_core.documents import Document
-from src.database.vector.vector_store import VectorStore
+from src.database.vector.vector_store import VectorStore, content_hash
 from src.models.document import StoredChunk, StoredFile
 
 
 class VectorIngestor:
-    def __init__(self, vector_store: VectorStore, embedder, conn):
+    def __init__(self, vector_store: VectorStore, embedder, pool, faiss_index=None):
         self.store = vector_store
         self.embedder = embedder
-        self.conn = conn
+        self.pool = pool
+        self.faiss_index = faiss_index
 
-    def ingest_documents(self, docs: List[Document], type: str = "vector"):
-        if not docs:
-            return "no_docs"
-
-        meta = docs[0].metadata
-        file_id = uuid4()
-
-        stored_file = StoredFile(
-            id=file_id,
-            owner_id=UUID(meta["owner_id"]),
+    def _stored_file(self, meta: dict) -> StoredFile:
+        return StoredFile(
+            id=uuid4(),
+            owner_id=UUID(str(meta["owner_id"])),
             role=meta["role"],
             access_level=meta["access_level"],
             source=meta.get("source"),
         )
 
+    def _embed_chunks(self, docs: List[Document], file_id: UUID, hashes: List[str]) -> List[StoredChunk]:
         texts = [d.page_content for d in docs]
         embeddings = self.embedder.embed_documents(texts)
 
-        chunks = [
+        return [
             StoredChunk(
                 id=uuid4(),
                 file_id=file_id,
                 content=doc.page_content,
                 embedding=emb,
                 metadata=doc.metadata or {},
+                content_hash=digest,
             )
-            for doc, emb in zip(docs, embeddings)
+            for doc, emb, digest in zip(docs, embeddings, hashes)
         ]
 
-        try:
+    def ingest_documents(self, docs: List[Document], type: str = "vector") -> dict:
+        if not docs:
+            return {"status": "no_docs"}
+
+        return {"status": "success", **self.ingest_batches([docs], type=type)}
+
+    def ingest_batches(
+        self,
+        batches: Iterable[List[Document]],
+        type: str = "vector",
+        progress: Callable[[dict], None] | None = None,
+    ) -> dict:
+        """
+        Embed and insert one batch at a time so only a single batch of
+        chunks and embeddings is held in memory. All batches belong to one
+        file and are committed together at the end.
+
+        Re-ingesting a source the owner already has is incremental: chunks
+        are matched by content hash, only new ones are embedded and
+        inserted, vanished ones are deleted and unchanged rows are kept
+        (their metadata is refreshed if it changed).
+        """
+        stored_file = None
+        relabeled = False
+        existing: dict[str, list[tuple[str, dict]]] = {}
+        seen: set[str] = set()
+        kept: set[str] = set()
+        removed: List[str] = []
+        metadata_updates: List[tuple[str, dict]] = []
+        mirrored: List[StoredChunk] = []
+        stats = {"batches": 0, "chunks": 0, "added": 0, "kept": 0, "removed": 0, "duplicates": 0}
+        # wall time split between waiting on the producer, the embedding
+        # model and Postgres
+        timings = {"load_s": 0.0, "embed_s": 0.0, "db_s": 0.0}
+        db_start = time.perf_counter()
+
+        with self.pool.transaction():
+            for batch in _timed(batches, timings, "load_s"):
+                if not batch:
+                    continue
+
+                if stored_file is None:
+                    stored_file, existing, removed, relabeled = self._resolve_file(batch[0].metadata)
+
+                new_docs, new_hashes = [], []
+                for doc in batch:
+                    digest = content_hash(doc.page_content)
+
+                    if digest in seen:
+                        stats["duplicates"] += 1
+                        continue
+                    seen.add(digest)
+
+                    if digest in existing:
+                        chunk_id, old_meta = existing[digest][0]
+                        kept.add(chunk_id)
+                        if _json(old_meta) != _json(doc.metadata or {}):
+                            metadata_updates.append((chunk_id, doc.metadata or {}))
+                        stats["kept"] += 1
+                        continue
+
+                    new_docs.append(doc)
+                    new_hashes.append(digest)
+
+                if new_docs:
+                    embed_start = time.perf_counter()
+                    chunks = self._embed_chunks(new_docs, stored_file.id, new_hashes)
+                    timings["embed_s"] += time.perf_counter() - embed_start
+                    self.store.insert_chunks(chunks, type=type)
+                    stats["added"] += len(chunks)
+
+                    if self.faiss_index is not None:
+                        mirrored.extend(chunks)
+
+                stats["batches"] += 1
+                stats["chunks"] = stats["added"] + stats["kept"]
+
+                if progress:
+                    progress(dict(stats))
+
+            stale = [
+                chunk_id
+                for rows in existing.values()
+                for chunk_id, _ in rows
+                if chunk_id not in kept
+            ]
+            self.store.delete_chunks(stale)
+            self.store.update_chunk_metadata(metadata_updates)
+            removed.extend(stale)
+            stats["removed"] = len(removed)
+
+        # everything inside the transaction that was not embedding, incl. commit
+        timings["db_s"] = time.perf_counter() - db_start - timings["embed_s"] - timings["load_s"]
+
+        if self.faiss_index is not None:
+            # an enclosing transaction may still roll back: mirror on commit
+            self.pool.after_commit(
+                lambda: self._mirror(stored_file, mirrored, removed, kept if relabeled else set(), type)
+            )
+
+        return {**stats, **timings}
+
+    def _mirror(self, stored_file, added: List[StoredChunk], removed: List[str], relabel: set[str], type: str):
+        self.faiss_index.remove_chunks(removed)
+        if relabel:
+            self.faiss_index.set_access_level(list(relabel), stored_file.access_level)
+        if stored_file is not None:
+            self.faiss_index.add(chunks=added, file=stored_file, type=type)
+
+    def _resolve_file(self, meta: dict) -> tuple[StoredFile, dict, List[str], bool]:
+        """
+        Reuse the owner's newest file for this source (if any) and load its
+        chunk hashes; older duplicate files of the same source are dropped.
+        A reused file takes the role / access_level of the new ingestion.
+        Returns (file, {hash: [(chunk_id, metadata)]}, removed chunk ids,
+        whether the access fields changed).
+        """
+        stored_file = self._stored_file(meta)
+        previous = []
+        if stored_file.source is not None:
+            previous = self.store.find_files(owner_id=stored_file.owner_id, source=stored_file.source)
+
+        if not previous:
             self.store.insert_file(stored_file)
-            self.store.insert_chunks(chunks, type=type)
-            self.conn.commit()
-        except Exception:
-            self.conn.rollback()
-            raise
+            return stored_file, {}, [], False
+
+        current, duplicates = previous[0], previous[1:]
+        removed = self.store.delete_files([f.id for f in duplicates])
 
-        return "success"
+        relabeled = (current.role, current.access_level) != (stored_file.role, stored_file.access_level)
+        if relabeled:
+            self.store.update_file_access(
+                current.id, role=stored_file.role, access_level=stored_file.access_level
+            )
+            current = replace(current, role=stored_file.role, access_level=stored_file.access_level)
+
+        existing: dict[str, list[tuple[str, dict]]] = {}
+        for chunk_id, digest, old_meta in self.store.chunk_hashes(current.id):
+            existing.setdefault(digest, []).append((chunk_id, old_meta))
+
+        return current, existing, removed, relabeled
+
+
+def _json(meta: dict) -> str:
+    return json.dumps(meta, sort_keys=True, default=str)
+
+
+def _timed(items: Iterable, timings: dict, key: str):
+    items = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        finally:
+            timings[key] += time.perf_counter() - start
+        yield item
@@ -1,28 +1,184 @@
+from src.database.vector.mmr import mmr_select
 from src.database.vector.vector_store import VectorStore
 from src.models.user import User
 
 
 class VectorRetriever:
-    def __init__(self, vector_store, embedder):
+    def __init__(
+        self,
+        vector_store,
+        embedder,
+        faiss_index=None,
+        *,
+        hybrid: bool = False,
+        rrf_k: int = 60,
+        mmr: bool = False,
+        mmr_lambda: float = 0.5,
+        mmr_candidates: int = 50,
+        max_per_group: int | None = None,
+        group_keys: tuple[str, ...] = ("faculty_id", "file_id"),
+    ):
+        """
+        hybrid:
+            Fuse dense and lexical (tsvector) results with reciprocal rank
+            fusion. rrf_k dampens the weight of top ranks.
+        mmr:
+            Over-fetch `mmr_candidates` chunks and pick the final k with
+            maximal marginal relevance (mmr_lambda = 1.0 -> pure relevance).
+        max_per_group:
+            Cap on chunks per entity, where the entity is the first of
+            `group_keys` present in the chunk metadata.
+        """
         self.vector_store: VectorStore = vector_store
         self.embedder = embedder
+        self.faiss_index = faiss_index
+        self.hybrid = hybrid
+        self.rrf_k = rrf_k
+        self.mmr = mmr
+        self.mmr_lambda = mmr_lambda
+        self.mmr_candidates = mmr_candidates
+        self.max_per_group = max_per_group
+        self.group_keys = group_keys
 
 
-    def retrieve(self, query:str, user:User, k:int = 5, type:str = "vector"):
+    def retrieve(
+        self,
+        query:str,
+        user:User,
+        k:int = 5,
+        type:str = "vector",
+        hybrid: bool | None = None,
+        metadata_filter: dict | None = None,
+        diversify: bool | None = None,
+    ):
+        """
+        metadata_filter:
+            Restrict the search to chunks whose metadata matches, e.g.
+            {"faculty_id": 12, "chunk_type": {"$in": ["research_profile", "achievement"]}}.
+            Supports equality, $in and $exists; evaluated in Postgres.
+        diversify:
+            Override the retriever's mmr / max_per_group setting.
+        """
         if not query:
             return []
-        
+
+        if diversify is None:
+            diversify = self.mmr or self.max_per_group is not None
+
         query_embedding = self.embedder.embed_query(query)
+        fetch_k = max(k, self.mmr_candidates) if diversify else k
+
+        if hybrid if hybrid is not None else self.hybrid:
+            docs = self._hybrid_retrieve(
+                query=query, query_embedding=query_embedding, user=user, k=fetch_k,
+                type=type, metadata_filter=metadata_filter,
+            )
+        else:
+            docs = self._dense_retrieve(
+                query_embedding=query_embedding, user=user, k=fetch_k,
+                type=type, metadata_filter=metadata_filter,
+            )
+
+        if diversify:
+            docs = self._diversify(query_embedding, docs, k)
+
+        return docs
+
+    def _diversify(self, query_embedding, docs, k:int):
+        if len(docs) <= 1:
+            return docs[:k]
+
+        embeddings = self.vector_store.get_embeddings([d.metadata["chunk_id"] for d in docs])
+        docs = [d for d in docs if d.metadata["chunk_id"] in embeddings]
+
+        groups = [
+            next((d.metadata[key] for key in self.group_keys if d.metadata.get(key) is not None), None)
+            for d in docs
+        ]
+
+        # keep the retriever's own ranking (RRF for hybrid) as relevance
+        relevance = None
+        if all(d.metadata.get("rrf_score") is not None for d in docs):
+            relevance = [d.metadata["rrf_score"] for d in docs]
+
+        picked = mmr_select(
+            query_embedding,
+            [embeddings[d.metadata["chunk_id"]] for d in docs],
+            k,
+            lambda_mult=self.mmr_lambda if self.mmr else 1.0,
+            groups=groups,
+            max_per_group=self.max_per_group,
+            relevance=relevance,
+        )
+
+        return [docs[i] for i in picked]
+
+    def _dense_retrieve(self, *, query_embedding, user:User, k:int, type:str, metadata_filter: dict | None = None):
+        # the FAISS mirror has no chunk metadata, so filtered searches go to Postgres
+        if self.faiss_index is not None and not metadata_filter:
+            hits = self.faiss_index.search(
+                query_embedding=query_embedding,
+                k=k,
+                min_access_level=user.access_level,
+                type=type,
+            )
+            return self.vector_store.get_chunks(hits)
 
         return self.vector_store.similarity_search(
             query_embedding=query_embedding,
             k=k,
             min_access_level=user.access_level,
-            type=type
+            type=type,
+            metadata_filter=metadata_filter,
         )
     
-    def list_files(self, user: User):
-        return self.vector_store.list_files(user=user)
+    def _hybrid_retrieve(self, *, query:str, query_embedding, user:User, k:int, type:str, metadata_filter: dict | None = None):
+        candidates = max(4 * k, 20)
+
+        dense = self._dense_retrieve(
+            query_embedding=query_embedding, user=user, k=candidates, type=type, metadata_filter=metadata_filter
+        )
+        lexical = self.vector_store.lexical_search(
+            query=query,
+            k=candidates,
+            min_access_level=user.access_level,
+            type=type,
+            metadata_filter=metadata_filter,
+        )
+
+        scores: dict[str, float] = {}
+        docs = {}
+
+        for ranked in (dense, lexical):
+            for rank, doc in enumerate(ranked, 1):
+                chunk_id = doc.metadata["chunk_id"]
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (self.rrf_k + rank)
+
+                if chunk_id in docs:
+                    docs[chunk_id].metadata.update(
+                        {key: value for key, value in doc.metadata.items() if value is not None}
+                    )
+                else:
+                    docs[chunk_id] = doc
+
+        fused = sorted(scores, key=scores.get, reverse=True)[:k]
+
+        for chunk_id in fused:
+            docs[chunk_id].metadata["rrf_score"] = scores[chunk_id]
+
+        return [docs[chunk_id] for chunk_id in fused]
+    
+    def list_files(self, user: User, **filters):
+        """
+        filters: limit, cursor, source_prefix, type, access_level,
+        with_chunk_counts (see VectorStore.list_files).
+        """
+        return self.vector_store.list_files(user=user, **filters)
     
     def delete_file(self, source:str):
-        return self.vector_store.delete_file(source)
\ No newline at end of file
+        deleted = self.vector_store.delete_file(source)
+
+        if self.faiss_index is not None:
+            self.vector_store.pool.after_commit(lambda: self.faiss_index.remove_source(source))
+
+        return deleted
\ No newline at end of file
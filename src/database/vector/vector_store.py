@@ -1,16 +1,74 @@
 # src/database/vector_store.py
 
+import base64
+import hashlib
 import json
+import re
+from datetime import datetime
 from uuid import UUID
 from typing import List
+import numpy as np
+from psycopg2.extras import execute_values
 from langchain_core.documents import Document
-from src.models.document import StoredChunk, StoredFile
+from src.database.db import from_vector, to_vector
+from src.database import quantization as quant
+from src.database.vector.metadata_filter import compile_metadata_filter
+from src.models.document import FilePage, StoredChunk, StoredFile
 from src.models.user import User
 
 
+ANN_METHODS = ("hnsw", "ivfflat")
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 class VectorStore:
-    def __init__(self, conn):
-        self.conn = conn
+    def __init__(
+        self,
+        pool,
+        batch_size: int = 500,
+        *,
+        ann_method: str | None = None,
+        ef_search: int = 100,
+        probes: int = 10,
+        iterative_scan: str | None = None,
+        quantization: str | None = None,
+        rerank_factor: int = 4,
+        dim: int = quant.EMBEDDING_DIM,
+    ):
+        """
+        ann_method: "hnsw" | "ivfflat" | None
+            Index type present on vector_chunks.embedding. Controls which
+            per-query search settings are applied. None = exact scan.
+        ef_search / probes:
+            Default candidate list size (hnsw) / lists probed (ivfflat).
+        iterative_scan: "relaxed_order" | "strict_order" | None
+            pgvector >= 0.8 keeps scanning the index until k rows survive
+            the access_level / type filters, so filtered top-k keeps recall.
+            Off by default; ignored (with a warning) on older pgvector.
+        quantization: "halfvec" | "bit" | None
+            Search a compact index first (see src/database/quantization.py),
+            then re-rank k * rerank_factor candidates exactly against the
+            float32 embedding column.
+        """
+        if ann_method is not None and ann_method not in ANN_METHODS:
+            raise ValueError(f"Unsupported ANN method: {ann_method}")
+        quant.validate(quantization)
+
+        self.pool = pool
+        self.batch_size = batch_size
+        self.ann_method = ann_method
+        self.ef_search = ef_search
+        self.probes = probes
+        self.iterative_scan = iterative_scan
+        # resolved from the installed pgvector on first search
+        self._iterative_scan_supported: bool | None = None
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self.dim = dim
+
     # ---------- FILES ----------
 
     def insert_file(self, file: StoredFile):
@@ -18,7 +76,7 @@ class VectorStore:
         INSERT INTO files (id, owner_id, role, access_level, source)
         VALUES (%s, %s, %s, %s, %s)
         """
-        with self.conn.cursor() as cur:
+        with self.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(
                 query,
                 (
@@ -30,16 +88,114 @@ class VectorStore:
                 )
             )
 
-    def list_files(self, user: User) -> List[StoredFile]:
+    def list_files(
+        self,
+        user: User,
+        *,
+        limit: int = 50,
+        cursor: str | None = None,
+        source_prefix: str | None = None,
+        type: str | None = None,
+        access_level: int | None = None,
+        with_chunk_counts: bool = False,
+    ) -> FilePage:
+        """
+        One page of the user's files, newest first.
+
+        Keyset pagination on (created_at, id): pass the previous page's
+        next_cursor to continue, so every page costs O(limit) on the
+        (owner_id, created_at, id) index no matter how deep it is.
+
+        source_prefix / access_level filter files directly; type keeps
+        files that have at least one chunk of that type. Chunk counts are
+        computed only for the rows of the page.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+
+        where, params = [], []
+
+        # only filter on owner when there is one, so the predicate is
+        # a plain index condition instead of (x IS NULL OR ...)
+        if user.id is not None:
+            where.append("f.owner_id = %s")
+            params.append(str(user.id))
+
+        if cursor is not None:
+            created_at, file_id = _decode_cursor(cursor)
+            where.append("(f.created_at, f.id) < (%s, %s::uuid)")
+            params.extend([created_at, file_id])
+
+        if source_prefix:
+            where.append("f.source LIKE %s ESCAPE '\\'")
+            params.append(_like_prefix(source_prefix))
+
+        if access_level is not None:
+            where.append("f.access_level = %s")
+            params.append(access_level)
+
+        if type is not None:
+            where.append(
+                "EXISTS (SELECT 1 FROM vector_chunks c WHERE c.file_id = f.id AND c.type = %s)"
+            )
+            params.append(type)
+
+        if with_chunk_counts:
+            count_sql = "(SELECT count(*) FROM vector_chunks c WHERE c.file_id = page.id)"
+        else:
+            count_sql = "NULL"
+
+        query = f"""
+        SELECT id, owner_id, role, access_level, source, created_at, {count_sql}
+        FROM (
+            SELECT f.id, f.owner_id, f.role, f.access_level, f.source, f.created_at
+            FROM files f
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY f.created_at DESC, f.id DESC
+            LIMIT %s
+        ) page
+        ORDER BY created_at DESC, id DESC
+        """
+        # one extra row tells whether another page exists
+        params.append(limit + 1)
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+
+        files = [
+            StoredFile(
+                id=row[0],
+                owner_id=row[1],
+                role=row[2],
+                access_level=row[3],
+                source=row[4],
+                created_at=row[5],
+                chunk_count=row[6],
+            )
+            for row in rows[:limit]
+        ]
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = files[-1]
+            next_cursor = _encode_cursor(last.created_at, last.id)
+
+        return FilePage(files=files, next_cursor=next_cursor)
+
+    def find_files(self, *, owner_id: UUID, source: str) -> List[StoredFile]:
+        """
+        Files previously ingested from `source` by `owner_id`, newest first.
+        """
         query = """
         SELECT id, owner_id, role, access_level, source
         FROM files
-        WHERE (%s IS NULL OR owner_id = %s)
+        WHERE owner_id = %s AND source = %s
         ORDER BY created_at DESC
         """
 
-        with self.conn.cursor() as cur:
-            cur.execute(query, (user.id, user.id))
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, (str(owner_id), source))
             rows = cur.fetchall()
 
         return [
@@ -53,36 +209,242 @@ class VectorStore:
             for row in rows
         ]
 
+    def update_file_access(self, file_id: UUID, *, role: str, access_level: int):
+        query = "UPDATE files SET role = %s, access_level = %s WHERE id = %s"
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, (role, access_level, str(file_id)))
+
     def delete_file(self, source: str) -> int:
         query = "DELETE FROM files WHERE source = %s"
 
-        with self.conn.cursor() as cur:
+        with self.pool.connection() as conn, conn.cursor() as cur:
             cur.execute(query, (source,))
             deleted = cur.rowcount
 
         return deleted
 
+    def delete_files(self, file_ids: list[UUID]) -> list[str]:
+        """
+        Delete files by id. Returns the ids of the chunks removed with them.
+        """
+        if not file_ids:
+            return []
+
+        ids = [str(file_id) for file_id in file_ids]
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM vector_chunks WHERE file_id = ANY(%s::uuid[]) RETURNING id",
+                (ids,),
+            )
+            chunk_ids = [str(row[0]) for row in cur.fetchall()]
+            cur.execute("DELETE FROM files WHERE id = ANY(%s::uuid[])", (ids,))
+
+        return chunk_ids
+
     # ---------- CHUNKS ----------
 
-    def insert_chunks(self, chunks: List[StoredChunk], type: str = "vector"):
+    def insert_chunks(
+        self,
+        chunks: List[StoredChunk],
+        type: str = "vector",
+        batch_size: int | None = None,
+    ) -> int:
+        """
+        Bulk insert chunks with multi-row VALUES statements.
+        One round trip per `batch_size` chunks instead of one per chunk.
+        """
+        if not chunks:
+            return 0
+
         query = """
-        INSERT INTO vector_chunks (id, file_id, content, embedding, metadata, type)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-
-        with self.conn.cursor() as cur:
-            for chunk in chunks:
-                cur.execute(
-                    query,
-                    (
-                        str(chunk.id),
-                        str(chunk.file_id),
-                        chunk.content,
-                        chunk.embedding,
-                        json.dumps(chunk.metadata),
-                        type,
-                    )
-                )
+        INSERT INTO vector_chunks (id, file_id, content, embedding, metadata, type, content_hash)
+        VALUES %s
+        """
+
+        rows = [
+            (
+                str(chunk.id),
+                str(chunk.file_id),
+                chunk.content,
+                to_vector(chunk.embedding),
+                json.dumps(chunk.metadata, default=str),
+                type,
+                chunk.content_hash or content_hash(chunk.content),
+            )
+            for chunk in chunks
+        ]
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            execute_values(
+                cur,
+                query,
+                rows,
+                template="(%s, %s, %s, %s::vector, %s::jsonb, %s, %s)",
+                page_size=batch_size or self.batch_size,
+            )
+
+        return len(rows)
+
+    def chunk_hashes(self, file_id: UUID) -> List[tuple[str, str, dict]]:
+        """
+        (chunk_id, content_hash, metadata) for every chunk of a file,
+        used to diff a re-ingested source against what is stored.
+        """
+        query = """
+        SELECT id, content_hash, metadata
+        FROM vector_chunks
+        WHERE file_id = %s
+        """
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, (str(file_id),))
+            rows = cur.fetchall()
+
+        return [(str(row[0]), row[1], row[2] or {}) for row in rows]
+
+    def delete_chunks(self, chunk_ids: list[str]) -> int:
+        if not chunk_ids:
+            return 0
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM vector_chunks WHERE id = ANY(%s::uuid[])",
+                ([str(chunk_id) for chunk_id in chunk_ids],),
+            )
+            deleted = cur.rowcount
+
+        return deleted
+
+    def update_chunk_metadata(self, updates: list[tuple[str, dict]]) -> int:
+        """
+        Rewrite metadata of unchanged chunks in place (no re-embedding).
+        """
+        if not updates:
+            return 0
+
+        query = """
+        UPDATE vector_chunks AS c
+        SET metadata = v.metadata
+        FROM (VALUES %s) AS v (id, metadata)
+        WHERE c.id = v.id
+        """
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            execute_values(
+                cur,
+                query,
+                [(str(chunk_id), json.dumps(meta, default=str)) for chunk_id, meta in updates],
+                template="(%s::uuid, %s::jsonb)",
+                page_size=self.batch_size,
+            )
+
+        return len(updates)
+
+    # ---------- INDEXES ----------
+
+    def create_index(
+        self,
+        *,
+        method: str = "hnsw",
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: int = 100,
+        types: list[str] | None = None,
+        quantization: str | None = None,
+    ) -> list[str]:
+        """
+        Create an ANN index on vector_chunks.embedding (cosine).
+
+        types:
+            None        -> one index over all chunks
+            list[str]   -> one partial index per chunk type, so the
+                           `type` filter never shrinks the candidate set
+        quantization:
+            None | "halfvec" | "bit" -> index the compact expression used by
+            similarity_search when the store has the same quantization
+        """
+        if method not in ANN_METHODS:
+            raise ValueError(f"Unsupported ANN method: {method}")
+        quant.validate(quantization)
+
+        if method == "hnsw":
+            options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+        else:
+            options = f"lists = {int(lists)}"
+
+        for t in types or []:
+            if not t.replace("_", "").isalnum():
+                raise ValueError(f"Invalid chunk type: {t}")
+
+        prefix = "vector_chunks_embedding"
+        if quantization:
+            prefix = f"{prefix}_{quantization}"
+
+        if types:
+            targets = [(f"{prefix}_{method}_{t}_idx", t) for t in types]
+        else:
+            targets = [(f"{prefix}_{method}_idx", None)]
+
+        expression = quant.index_expression("embedding", quantization=quantization, dim=self.dim)
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            for name, t in targets:
+                sql = f"""
+                CREATE INDEX IF NOT EXISTS {name}
+                ON vector_chunks USING {method} {expression}
+                WITH ({options})
+                """
+                if t is None:
+                    cur.execute(sql)
+                else:
+                    cur.execute(sql + " WHERE type = %s", (t,))
+
+        self.ann_method = method
+        return [name for name, _ in targets]
+
+    def _apply_search_params(
+        self,
+        cur,
+        *,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        limit: int = 0,
+    ):
+        """
+        Per-query ANN settings. SET LOCAL only lives until the current
+        transaction ends, so settings never leak into unrelated queries.
+        """
+        if self.ann_method == "hnsw":
+            # an hnsw scan returns at most ef_search rows
+            ef_search = min(1000, max(ef_search or self.ef_search, limit))
+            cur.execute("SET LOCAL hnsw.ef_search = %s", (ef_search,))
+            if self._use_iterative_scan(cur):
+                cur.execute("SET LOCAL hnsw.iterative_scan = %s", (self.iterative_scan,))
+
+        elif self.ann_method == "ivfflat":
+            cur.execute("SET LOCAL ivfflat.probes = %s", (probes or self.probes,))
+            if self._use_iterative_scan(cur):
+                cur.execute("SET LOCAL ivfflat.iterative_scan = %s", (self.iterative_scan,))
+
+    def _use_iterative_scan(self, cur) -> bool:
+        """
+        iterative_scan settings only exist from pgvector 0.8; check the
+        installed version once.
+        """
+        if not self.iterative_scan:
+            return False
+
+        if self._iterative_scan_supported is None:
+            cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = cur.fetchone()
+            version = tuple(int(part) for part in re.findall(r"\d+", row[0])[:2]) if row else ()
+            self._iterative_scan_supported = version >= (0, 8)
+            if not self._iterative_scan_supported:
+                print(f"pgvector {row[0] if row else '?'} has no iterative_scan, ignoring it")
+
+        return self._iterative_scan_supported
 
     # ---------- RETRIEVAL ----------
 
@@ -92,9 +454,157 @@ class VectorStore:
         k: int,
         min_access_level: int,
         type: str = "vector",
+        *,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        metadata_filter: dict | None = None,
     ) -> List[Document]:
-        query = """
-        SELECT 
+        """
+        metadata_filter:
+            Chunk metadata predicate (see compile_metadata_filter), applied
+            inside the ANN scan so top-k is taken over matching chunks only.
+        """
+        if self.quantization is not None:
+            return self._quantized_search(
+                query_embedding, k, min_access_level, type,
+                ef_search=ef_search, probes=probes, metadata_filter=metadata_filter,
+            )
+
+        filter_sql, filter_params = _filter_clause(metadata_filter)
+
+        # inner query orders by the raw distance so the ANN index is usable;
+        # the outer ORDER BY restores exact order after a relaxed iterative scan
+        query = f"""
+        SELECT
+            id,
+            content,
+            metadata,
+            file_id,
+            owner_id,
+            role,
+            source,
+            access_level,
+            1 - distance AS similarity
+        FROM (
+            SELECT
+                c.id,
+                c.content,
+                c.metadata,
+                f.id AS file_id,
+                f.owner_id,
+                f.role,
+                f.source,
+                f.access_level,
+                c.embedding <=> %s::vector AS distance
+            FROM vector_chunks c
+            JOIN files f ON c.file_id = f.id
+            WHERE f.access_level >= %s
+              AND c.type = %s{filter_sql}
+            ORDER BY distance
+            LIMIT %s
+        ) nearest
+        ORDER BY distance
+        """
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            self._apply_search_params(cur, ef_search=ef_search, probes=probes, limit=k)
+            cur.execute(
+                query,
+                (to_vector(query_embedding), min_access_level, type, *filter_params, k),
+            )
+            rows = cur.fetchall()
+
+        return [self._row_to_document(row) for row in rows]
+
+    def _quantized_search(
+        self,
+        query_embedding: list[float],
+        k: int,
+        min_access_level: int,
+        type: str,
+        *,
+        ef_search: int | None,
+        probes: int | None,
+        metadata_filter: dict | None = None,
+    ) -> List[Document]:
+        """
+        Shortlist k * rerank_factor chunks on the compact index, then
+        re-rank them by exact cosine distance on the float32 column.
+        """
+        filter_sql, filter_params = _filter_clause(metadata_filter)
+        coarse = quant.coarse_distance(
+            "c.embedding", "%s::vector", quantization=self.quantization, dim=self.dim
+        )
+        candidates = k * self.rerank_factor
+
+        query = f"""
+        SELECT
+            id,
+            content,
+            metadata,
+            file_id,
+            owner_id,
+            role,
+            source,
+            access_level,
+            1 - (embedding <=> %s::vector) AS similarity
+        FROM (
+            SELECT
+                c.id,
+                c.content,
+                c.metadata,
+                f.id AS file_id,
+                f.owner_id,
+                f.role,
+                f.source,
+                f.access_level,
+                c.embedding
+            FROM vector_chunks c
+            JOIN files f ON c.file_id = f.id
+            WHERE f.access_level >= %s
+              AND c.type = %s{filter_sql}
+            ORDER BY {coarse}
+            LIMIT %s
+        ) candidates
+        ORDER BY similarity DESC
+        LIMIT %s
+        """
+
+        vec = to_vector(query_embedding)
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            self._apply_search_params(cur, ef_search=ef_search, probes=probes, limit=candidates)
+            cur.execute(query, (vec, min_access_level, type, *filter_params, vec, candidates, k))
+            rows = cur.fetchall()
+
+        return [self._row_to_document(row) for row in rows]
+
+    def lexical_search(
+        self,
+        query: str,
+        k: int,
+        min_access_level: int,
+        type: str = "vector",
+        *,
+        metadata_filter: dict | None = None,
+    ) -> List[Document]:
+        """
+        Full-text search over vector_chunks.content_tsv (GIN indexed).
+        Query lexemes are OR-ed so exact tokens such as subject codes or
+        emails match even when the rest of the question does not.
+        """
+        filter_sql, filter_params = _filter_clause(metadata_filter)
+
+        query_sql = f"""
+        WITH q AS (
+            -- lexemes are already normalized, so 'simple' only ORs them
+            SELECT to_tsquery(
+                'simple',
+                coalesce(string_agg(quote_literal(lexeme), ' | '), '')
+            ) AS tsq
+            FROM unnest(tsvector_to_array(to_tsvector('english', %s))) AS lexeme
+        )
+        SELECT
             c.id,
             c.content,
             c.metadata,
@@ -103,42 +613,133 @@ class VectorStore:
             f.role,
             f.source,
             f.access_level,
-            1 - (c.embedding <=> %s::vector) AS similarity
+            NULL AS similarity,
+            ts_rank_cd(c.content_tsv, q.tsq) AS lexical_score
         FROM vector_chunks c
         JOIN files f ON c.file_id = f.id
-        WHERE f.access_level >= %s
-          AND c.type = %s
-        ORDER BY similarity DESC
+        CROSS JOIN q
+        WHERE c.content_tsv @@ q.tsq
+          AND f.access_level >= %s
+          AND c.type = %s{filter_sql}
+        ORDER BY lexical_score DESC
         LIMIT %s
         """
 
-        with self.conn.cursor() as cur:
-            cur.execute(
-                query,
-                (query_embedding, min_access_level, type, k),
-            )
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(query_sql, (query, min_access_level, type, *filter_params, k))
             rows = cur.fetchall()
 
         documents = []
         for row in rows:
-            meta = row[2] or {}
-            if isinstance(meta, str):
-                meta = json.loads(meta)
-
-            documents.append(
-                Document(
-                    page_content=row[1],
-                    metadata={
-                        **meta,
-                        "chunk_id": str(row[0]),
-                        "file_id": str(row[3]),
-                        "owner_id": str(row[4]),
-                        "role": row[5],
-                        "source": row[6],
-                        "access_level": row[7],
-                        "similarity": row[8],
-                    },
-                )
-            )
+            doc = self._row_to_document(row[:9])
+            doc.metadata["lexical_score"] = row[9]
+            documents.append(doc)
 
         return documents
+
+    def iter_embeddings(self, batch_size: int = 10_000):
+        """
+        Stream (chunk_id, source, access_level, type, embedding) for every
+        chunk. Used to build in-process indexes (FaissVectorIndex).
+        """
+        query = """
+        SELECT c.id, f.source, f.access_level, c.type, c.embedding
+        FROM vector_chunks c
+        JOIN files f ON c.file_id = f.id
+        """
+
+        with self.pool.connection() as conn, conn.cursor(name="iter_embeddings") as cur:
+            cur.itersize = batch_size
+            cur.execute(query)
+            for row in cur:
+                yield row
+
+    def get_embeddings(self, chunk_ids: list[str]) -> dict[str, np.ndarray]:
+        """
+        {chunk_id: embedding} for a candidate set (primary-key lookup).
+        """
+        if not chunk_ids:
+            return {}
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, embedding FROM vector_chunks WHERE id = ANY(%s::uuid[])",
+                ([str(chunk_id) for chunk_id in chunk_ids],),
+            )
+            return {str(row[0]): from_vector(row[1]) for row in cur.fetchall()}
+
+    def get_chunks(self, hits: list[tuple[str, float]]) -> List[Document]:
+        """
+        Fetch content/metadata for (chunk_id, similarity) hits produced
+        outside Postgres, preserving hit order.
+        """
+        if not hits:
+            return []
+
+        query = """
+        SELECT
+            c.id,
+            c.content,
+            c.metadata,
+            f.id,
+            f.owner_id,
+            f.role,
+            f.source,
+            f.access_level
+        FROM vector_chunks c
+        JOIN files f ON c.file_id = f.id
+        WHERE c.id = ANY(%s::uuid[])
+        """
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, ([str(chunk_id) for chunk_id, _ in hits],))
+            rows = {str(row[0]): row for row in cur.fetchall()}
+
+        return [
+            self._row_to_document((*rows[str(chunk_id)], similarity))
+            for chunk_id, similarity in hits
+            if str(chunk_id) in rows
+        ]
+
+    def _row_to_document(self, row) -> Document:
+        meta = row[2] or {}
+        if isinstance(meta, str):
+            meta = json.loads(meta)
+
+        return Document(
+            page_content=row[1],
+            metadata={
+                **meta,
+                "chunk_id": str(row[0]),
+                "file_id": str(row[3]),
+                "owner_id": str(row[4]),
+                "role": row[5],
+                "source": row[6],
+                "access_level": row[7],
+                "similarity": row[8],
+            },
+        )
+
+
+def _filter_clause(metadata_filter: dict | None) -> tuple[str, list]:
+    sql, params = compile_metadata_filter(metadata_filter, column="c.metadata")
+    return (f"\n              AND {sql}" if sql else ""), params
+
+
+def _encode_cursor(created_at: datetime, file_id) -> str:
+    raw = f"{created_at.isoformat()}|{file_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, file_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), str(UUID(file_id))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _like_prefix(prefix: str) -> str:
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
@@ -1,22 +1,13 @@
-from langchain_community.document_loaders import TextLoader, PyPDFLoader, Docx2txtLoader
-from langchain_core.messages import HumanMessage, AIMessage
-from src.database.db import get_connection
 from src.schema.generate_rules import generate_rules
 from src.services.scrape_service import parse_faculty_from_url
 from src.services.user_service import create_user, user_login
 from src.bootstrap.bootstrap import create_app
 from src.schema.schema import schema, system_user
 from src.schema.realisation_rules import realisation_rules
-from src.bootstrap.bootstrap import conn
-def create_loader(path: str):
-    if path.endswith(".txt"):
-        return TextLoader(path)
-    elif path.endswith(".pdf"):
-        return PyPDFLoader(path)
-    elif path.endswith(".docx"):
-        return Docx2txtLoader(path)
-    else:
-        raise ValueError("Unsupported file type")
+from src.bootstrap.bootstrap import pool, create_chat_history
+from src.util.lazy import boot_report
+from src.pipelines.loaders import create_loader
+
 
 def main():
     print("_" * 100)
@@ -26,14 +17,18 @@ def main():
     print("  login         -> login as a user")
     print("  query         -> ask a question")
     print("  add           -> ingest a text file")
+    print("  add dir       -> ingest every file in a directory / glob")
     print("  list          -> list all the uploaded files")
     print("  delete        -> delete a file with source")
     print("  exit          -> quit")
     print("  update schema -> ingest SQL schema and rules into store")
+    print("  boot          -> show where startup time went")
+    print("  cache         -> show answer cache stats")
 
     print("_" * 100)
 
     app = create_app()
+    print(boot_report())
 
     current_user = system_user
 
@@ -73,7 +68,11 @@ def main():
 
             print("Entering chat mode. Type `quit` or `exit` to leave.\n")
 
-            chat_history = []  # List[HumanMessage | AIMessage]
+            # load the reranker while the user types
+            app.warm()
+
+            # token-bounded: last turns verbatim + rolling summary
+            chat_history = create_chat_history()
 
             while True:
                 query = input("you> ").strip()
@@ -84,20 +83,31 @@ def main():
 
                 test = False
 
-                answer = app.inference(
-                    query=query,
-                    user=current_user,
-                    chat_history=chat_history,
-                    test=test
-                )
+                if test:
+                    answer = app.inference(
+                        query=query,
+                        user=current_user,
+                        chat_history=chat_history,
+                        test=test
+                    )
+                    print(f"\n\n\n\nassistant> {answer}\n")
+                else:
+                    stream = app.inference_stream(
+                        query=query,
+                        user=current_user,
+                        chat_history=chat_history,
+                    )
 
-                print(f"\n\n\n\nassistant> {answer}\n")
-                if not test:
-                    chat_history.append(HumanMessage(content=query))
-                    chat_history.append(AIMessage(content=answer))
+                    print("\n\n\n\nassistant> ", end="", flush=True)
+                    for token in stream:
+                        print(token, end="", flush=True)
+                    source = "cached, " if stream.cached else ""
+                    print(f"\n\n({source}first token {stream.ttft or 0:.2f}s, total {stream.total:.2f}s)\n")
+                    answer = stream.text
 
-                    if len(chat_history) > 10:  
-                        chat_history = chat_history[-10:]
+                if not test:
+                    # older turns are summarized in the background
+                    chat_history.add_turn(query, answer)
 
 
         elif cmd.lower() == "list":
@@ -105,8 +115,24 @@ def main():
                         print("No user set. Run `create` first.\n")
                         continue
 
-                    files = app.vector_retriever.list_files(current_user)
-                    print(files)        
+                    prefix = input("source prefix (blank for all): ").strip() or None
+                    cursor = None
+
+                    while True:
+                        page = app.vector_retriever.list_files(
+                            current_user,
+                            limit=20,
+                            cursor=cursor,
+                            source_prefix=prefix,
+                            with_chunk_counts=True,
+                        )
+
+                        for f in page.files:
+                            print(f"{f.created_at:%Y-%m-%d %H:%M}  {f.chunk_count:>6} chunks  L{f.access_level}  {f.source}")
+
+                        cursor = page.next_cursor
+                        if cursor is None or input("more? (y/n): ").strip().lower() != "y":
+                            break
 
         elif cmd.lower() == "add":
             if current_user is None:
@@ -121,9 +147,13 @@ def main():
 
                 result = app.ingest_vector(
                     loader=loader,
-                    user=current_user
+                    user=current_user,
+                    progress=lambda p: print(
+                        f"pages {p['pages']}  chunks {p['chunks']}", end="\r"
+                    ),
                 )
 
+                print()
                 print("Vector ingestion completed.")
                 print(result)
 
@@ -141,15 +171,14 @@ def main():
             elif ingest_type == "faculty":
                 profiles = parse_faculty_from_url("https://nitte.edu.in/nmit/btech-computer-science-engineering.php")
                 try:
-                    result = app.ingest_faculty_profiles(
-                        profiles=profiles,
-                        dept_name="Computer Science and Engineering",
-                        user=system_user,
-                        truncate=True
-                    )
-                    conn.commit()
+                    with pool.transaction():
+                        result = app.ingest_faculty_profiles(
+                            profiles=profiles,
+                            dept_name="Computer Science and Engineering",
+                            user=system_user,
+                            truncate=True
+                        )
                 except Exception as e:
-                    conn.rollback()
                     print(e)
                     
 
@@ -170,22 +199,53 @@ def main():
                 print("Try again")
                 continue
 
-            output = app.vector_retriever.delete_file(source)
+            output = app.delete_file(source)
             print(output)
 
+        elif cmd.lower() == "add dir":
+            if current_user is None:
+                print("No user set. Run `create` first.\n")
+                continue
+
+            path = input("directory or glob: ").strip()
+
+            summary = app.ingest_directory(
+                path=path,
+                user=current_user,
+                progress=lambda p: print(
+                    f"files {p['done'] + p['failed']}/{p['files']}  failed {p['failed']}", end="\r"
+                ),
+            )
+
+            print()
+            for failed_path, error in summary["errors"].items():
+                print(f"failed: {failed_path}: {error}")
+            print(
+                f"{summary['ingested']}/{summary['files']} files, {summary['chunks']} chunks "
+                f"(+{summary['added']} ={summary['kept']} -{summary['removed']}) "
+                f"in {summary['elapsed_s']:.1f}s: {summary['files_per_s']:.2f} files/s, "
+                f"{summary['chunks_per_s']:.1f} chunks/s, "
+                f"embed {summary['embed_s']:.1f}s vs db {summary['db_s']:.1f}s"
+            )
+
+        elif cmd.lower() == "boot":
+            print(boot_report())
+
+        elif cmd.lower() == "cache":
+            print(app.answer_cache.stats() if app.answer_cache else "answer cache disabled")
+
         elif cmd.lower() == "update schema":
             try:
-                result = app.ingest_schema(
-                    realisation_rules=realisation_rules,
-                    schema=schema,
-                    generate_rules=generate_rules,
-                    truncate=True
-                )
+                with pool.transaction():
+                    result = app.ingest_schema(
+                        realisation_rules=realisation_rules,
+                        schema=schema,
+                        generate_rules=generate_rules,
+                        truncate=True
+                    )
                 # print(result)
                 print("Schema ingestion completed.")
-                conn.commit()
             except Exception as e:
-                conn.rollback()
                 print(e)
 
         else:
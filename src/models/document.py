@@ -15,6 +15,14 @@ class StoredFile:
     role: str
     access_level: int
     source: Optional[str]
+    created_at: Optional[datetime] = None
+    chunk_count: Optional[int] = None
+
+@dataclass
+class FilePage:
+    files: List[StoredFile]
+    # opaque keyset cursor for the next page, None on the last page
+    next_cursor: Optional[str] = None
 
 @dataclass
 class StoredChunk:
@@ -23,6 +31,7 @@ class StoredChunk:
     content: str
     embedding: List[float]
     metadata: dict
+    content_hash: Optional[str] = None
 
 @dataclass 
 class RuleChunk:
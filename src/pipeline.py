@@ -1,7 +1,11 @@
+import time
 from pydoc import doc
 from typing import List
 from langchain_core.documents import Document
 from src.models.user import User
+from src.pipelines.answer_cache import AnswerCache
+from src.pipelines.answer_pipeline import AnswerStream
+from src.pipelines.chat_history import ChatHistory
 from src.schema import realisation_rules
 
 
@@ -12,28 +16,73 @@ class MainPipeline:
         retrieval,
         answer,
         guidance_ingestor,
-        scrape_ingestion
-
+        scrape_ingestion,
+        vector_retriever=None,
+        directory_ingestion=None,
+        answer_cache: AnswerCache | None = None,
+        pool=None,
     ):
+        self.answer_cache = answer_cache
+        self.pool = pool
         self.vector_ingestion = vector_ingestion
+        self.directory_ingestion = directory_ingestion
+        self.vector_retriever = vector_retriever
         self.retrieval = retrieval
         self.answer = answer
         self.guidance_ingestor = guidance_ingestor
         self.scrape_ingestion = scrape_ingestion
 
     # ---------- INGESTION ----------
-
-    def ingest_vector(self, loader, user: User):
+    # every write path invalidates cached answers, even when it fails
+    # half way (a rolled-back write just costs a few cache misses).
+    # Inside a caller's pool.transaction() the invalidation waits for its
+    # commit: answers computed from pre-commit data before that are then
+    # rejected by the cache version.
+
+    def _invalidate_answers(self):
+        if self.answer_cache is None:
+            return
+
+        if self.pool is not None:
+            self.pool.after_commit(self.answer_cache.invalidate)
+        else:
+            self.answer_cache.invalidate()
+
+    def ingest_vector(self, loader, user: User, progress=None):
         if not self.vector_ingestion:
             raise ValueError("Vector scrape_ingestion is not configured")
 
-        return self.vector_ingestion.run(loader, user)
+        try:
+            return self.vector_ingestion.run(loader, user, progress=progress)
+        finally:
+            self._invalidate_answers()
+
+    def ingest_directory(self, path: str, user: User, progress=None):
+        if not self.directory_ingestion:
+            raise ValueError("Directory ingestion is not configured")
+
+        try:
+            return self.directory_ingestion.run(path, user, progress=progress)
+        finally:
+            self._invalidate_answers()
 
     def ingest_sql(self, path: str, user: User):
         if not self.sql_ingestion:
             raise ValueError("SQL scrape_ingestion is not configured")
 
-        return self.sql_ingestion.run(path, user)
+        try:
+            return self.sql_ingestion.run(path, user)
+        finally:
+            self._invalidate_answers()
+
+    def delete_file(self, source: str):
+        if not self.vector_retriever:
+            raise ValueError("Vector retriever is not configured")
+
+        try:
+            return self.vector_retriever.delete_file(source)
+        finally:
+            self._invalidate_answers()
     
     def ingest_schema(
         self,
@@ -43,7 +92,17 @@ class MainPipeline:
         generate_rules: list[dict],
         truncate:bool = False
     ) -> dict:
-        
+        try:
+            return self._ingest_schema(
+                realisation_rules=realisation_rules,
+                schema=schema,
+                generate_rules=generate_rules,
+                truncate=truncate,
+            )
+        finally:
+            self._invalidate_answers()
+
+    def _ingest_schema(self, *, realisation_rules, schema, generate_rules, truncate) -> dict:
         if truncate:
             self.guidance_ingestor.truncate()
 
@@ -67,12 +126,23 @@ class MainPipeline:
 
     
     def ingest_faculty_profiles(self, *, profiles:list[dict], dept_name:str, user:User, truncate: bool = False):
-        if truncate:
-            self.scrape_ingestion.truncate_tables(tables=["faculty", "faculty_subjects", "subjects"])
-        return self.scrape_ingestion.ingest_faculty_profiles(profiles=profiles, dept_name=dept_name, user=user)
+        try:
+            if truncate:
+                self.scrape_ingestion.truncate_tables(tables=["faculty", "faculty_subjects", "subjects"])
+            return self.scrape_ingestion.ingest_faculty_profiles(profiles=profiles, dept_name=dept_name, user=user)
+        finally:
+            self._invalidate_answers()
 
     # ---------- INFERENCE ----------
 
+    def warm(self):
+        """
+        Start loading query-only models (the reranker) in the background.
+        """
+        reranker = getattr(self.retrieval, "reranker", None)
+        if reranker is not None:
+            reranker.warm()
+
     def inference(
         self,
         query: str,
@@ -86,6 +156,13 @@ class MainPipeline:
         if not all([self.retrieval, self.answer]):
             raise ValueError("Inference pipeline is not fully configured")
 
+        cacheable = not test and self._cacheable(chat_history)
+        if cacheable:
+            version = self.answer_cache.version
+            cached = self.answer_cache.get(query=query, access_level=user.access_level)
+            if cached is not None:
+                return cached
+
         docs = self.retrieval.run(query, user)
 
         if test:
@@ -94,5 +171,64 @@ class MainPipeline:
         vector_docs = docs.get("vector")
         sql_rows = docs.get("sql")
 
-        return self.answer.run(query, vector_docs=vector_docs, sql_rows=sql_rows, chat_history=chat_history)
+        answer = self.answer.run(query, vector_docs=vector_docs, sql_rows=sql_rows, chat_history=chat_history)
+
+        if cacheable:
+            self.answer_cache.put(query=query, access_level=user.access_level, answer=answer, version=version)
+
+        return answer
+
+    def _cacheable(self, chat_history) -> bool:
+        """
+        Cached answers are only used for questions asked without prior
+        context: a follow-up ("and on tuesday?") depends on the history,
+        which is not part of the cache key.
+        """
+        if self.answer_cache is None:
+            return False
+
+        if isinstance(chat_history, ChatHistory):
+            return not chat_history.messages()
+
+        return not chat_history
+
+    def inference_stream(
+        self,
+        query: str,
+        user: User,
+        chat_history=None,
+    ):
+        """
+        Like inference(), but returns an AnswerStream: iterate it to get
+        tokens as they are generated; .ttft / .total / .text are set as it
+        is consumed. TTFT is measured from the start of this call, so it
+        includes retrieval.
+        """
+        start = time.perf_counter()
+        chat_history = chat_history or []
+
+        if not all([self.retrieval, self.answer]):
+            raise ValueError("Inference pipeline is not fully configured")
+
+        cacheable = self._cacheable(chat_history)
+        if cacheable:
+            version = self.answer_cache.version
+            cached = self.answer_cache.get(query=query, access_level=user.access_level)
+            if cached is not None:
+                return AnswerStream([cached], started_at=start, cached=True)
+
+        docs = self.retrieval.run(query, user)
+
+        stream = self.answer.stream(
+            query,
+            vector_docs=docs.get("vector"),
+            sql_rows=docs.get("sql"),
+            chat_history=chat_history,
+            started_at=start,
+        )
+        if cacheable:
+            stream.on_complete = lambda answer: self.answer_cache.put(
+                query=query, access_level=user.access_level, answer=answer, version=version
+            )
+        return stream
 
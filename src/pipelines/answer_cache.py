@@ -0,0 +1,97 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Case, whitespace and punctuation insensitive form of a question:
+    "When is the Cloud Computing class on Monday?" and
+    "when is the cloud computing class on monday" share one entry.
+    """
+    return " ".join(_PUNCT.sub(" ", query.lower()).split())
+
+
+class AnswerCache:
+    """
+    Final-answer cache keyed by (normalized query, access_level).
+
+    access_level is part of the key because it is the only user attribute
+    retrieval depends on, so users never see answers built from chunks
+    above their level. Entries expire after `ttl` seconds, the least
+    recently used are evicted past `max_size`, and invalidate() drops
+    everything whenever the underlying files or tables change.
+
+    Answers computed across an invalidate() are not stored: callers read
+    `version` before computing and pass it back to put().
+    """
+
+    def __init__(self, *, ttl: float = 600.0, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries: OrderedDict[tuple[str, int], tuple[str, float]] = OrderedDict()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, *, query: str, access_level: int) -> str | None:
+        key = (normalize_query(query), access_level)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, *, query: str, access_level: int, answer: str, version: int):
+        key = (normalize_query(query), access_level)
+
+        with self._lock:
+            if version != self._version:
+                return
+
+            self._entries[key] = (answer, time.monotonic())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
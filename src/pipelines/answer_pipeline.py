@@ -1,35 +1,185 @@
+import time
+from typing import Callable, Iterable
+
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
+from src.pipelines.chat_history import ChatHistory
+from src.util.count_tokens import count_tokens, truncate_tokens
+
+# metadata keys that carry a relevance score, best signal first
+RELEVANCE_KEYS = ("rerank_score", "rrf_score", "similarity")
+
+
+class AnswerStream:
+    """
+    Iterable over answer tokens as the LLM produces them.
+
+    Timing is recorded while it is consumed:
+        ttft  -> seconds from `started_at` to the first non-empty token
+        total -> seconds from `started_at` until the stream ended
+    `text` holds the full answer once iteration has finished.
+    `on_complete(text)` runs only if the stream was consumed to the end.
+    """
+
+    def __init__(
+        self,
+        tokens: Iterable[str],
+        *,
+        started_at: float | None = None,
+        on_complete: Callable[[str], None] | None = None,
+        cached: bool = False,
+    ):
+        self._tokens = tokens
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.on_complete = on_complete
+        self.cached = cached
+        self.ttft: float | None = None
+        self.total: float | None = None
+        self.text = ""
+
+    def __iter__(self):
+        parts = []
+        try:
+            for token in self._tokens:
+                if not token:
+                    continue
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - self.started_at
+                parts.append(token)
+                yield token
+
+            if self.on_complete is not None:
+                self.on_complete("".join(parts))
+        finally:
+            self.total = time.perf_counter() - self.started_at
+            self.text = "".join(parts)
 
 
 class AnswerPipeline:
-    def __init__(self, llm, history_size=3, prompt=None):
+    def __init__(
+        self,
+        llm,
+        history_size=3,
+        prompt=None,
+        *,
+        context_budget: int = 3000,
+        sql_share: float = 0.6,
+        max_doc_tokens: int = 400,
+        max_cell_chars: int = 200,
+    ):
+        """
+        context_budget:
+            Max tokens (tiktoken) of the Context block.
+        sql_share:
+            Part of the budget reserved for DATABASE RESULTS when reference
+            documents are also present; whatever SQL leaves unused goes to
+            the documents.
+        max_doc_tokens / max_cell_chars:
+            Per-chunk and per-cell truncation so one oversized item can't
+            crowd out the rest.
+        """
         self.llm = llm
         self.history_size= history_size
         self.prompt = prompt or self._default_prompt()
+        self.context_budget = context_budget
+        self.sql_share = sql_share
+        self.max_doc_tokens = max_doc_tokens
+        self.max_cell_chars = max_cell_chars
 
     def _build_context(
         self,
         *,
         vector_docs: list[Document],
         sql_rows: list[dict],
-    ) -> str:
+    ) -> tuple[str, int]:
+        """
+        Pack SQL rows and reference chunks into the token budget.
+        Returns (context, tokens used).
+
+        SQL rows are rendered as compact pipe tables (one header per
+        column set instead of `k: v` per row) in their original order and
+        cut off with an "N more rows" note. Chunks are added by relevance
+        score, each truncated to max_doc_tokens.
+        """
+        budget = self.context_budget
         parts = []
+        used = 0
 
         if sql_rows:
-            parts.append("DATABASE RESULTS:")
-            for row in sql_rows:
-                parts.append(
-                    "- " + ", ".join(f"{k}: {v}" for k, v in row.items())
-                )
+            sql_budget = int(budget * self.sql_share) if vector_docs else budget
+            lines, used = self._pack_sql(sql_rows, sql_budget)
+            parts.extend(lines)
 
         if vector_docs:
-            parts.append("\nREFERENCE DOCUMENTS:")
-            for i, doc in enumerate(vector_docs, 1):
-                parts.append(f"[Doc {i}] {doc.page_content}")
+            header = "\nREFERENCE DOCUMENTS:"
+            doc_lines = []
+            # +1 per line for the joining newline
+            remaining = budget - used - count_tokens(header) - 1
+
+            for i, doc in enumerate(self._by_relevance(vector_docs), 1):
+                prefix = f"[Doc {i}] "
+                room = min(self.max_doc_tokens, remaining - count_tokens(prefix) - 1)
+                if room <= 0:
+                    break
+
+                line = prefix + truncate_tokens(doc.page_content, room)
+                remaining -= count_tokens(line) + 1
+                doc_lines.append(line)
+
+            if doc_lines:
+                parts.append(header)
+                parts.extend(doc_lines)
+
+        context = "\n".join(parts).strip()
+        return context, count_tokens(context)
+
+    def _pack_sql(self, rows: list[dict], budget: int) -> tuple[list[str], int]:
+        header = "DATABASE RESULTS:"
+        lines = [header]
+        used = count_tokens(header) + 1
+        columns = None
+        packed = 0
+
+        for row in rows:
+            new_lines = []
+            if tuple(row.keys()) != columns:
+                columns = tuple(row.keys())
+                new_lines.append(" | ".join(str(c) for c in columns))
+
+            new_lines.append(" | ".join(self._cell(v) for v in row.values()))
+
+            cost = sum(count_tokens(line) + 1 for line in new_lines)
+            if used + cost > budget:
+                break
+
+            lines.extend(new_lines)
+            used += cost
+            packed += 1
+
+        if packed < len(rows):
+            note = f"... {len(rows) - packed} more rows omitted"
+            lines.append(note)
+            used += count_tokens(note) + 1
+
+        return lines, used
 
-        return "\n".join(parts).strip()
+    def _cell(self, value) -> str:
+        if value is None:
+            return ""
+
+        text = " ".join(str(value).split()).replace("|", "/")
+        if len(text) > self.max_cell_chars:
+            text = text[: self.max_cell_chars - 3] + "..."
+        return text
+
+    def _by_relevance(self, docs: list[Document]) -> list[Document]:
+        for key in RELEVANCE_KEYS:
+            if all(doc.metadata.get(key) is not None for doc in docs):
+                return sorted(docs, key=lambda d: d.metadata[key], reverse=True)
+
+        # no common score: keep retrieval order
+        return list(docs)
 
 
     def _default_prompt(self):
@@ -94,29 +244,63 @@ class AnswerPipeline:
 
 
     
-    def run(
-        self,
-        query: str,
-        vector_docs: list[Document] = [],
-        sql_rows: list[dict] = [],
-        chat_history=None,
-    ):
-        chat_history = chat_history or []
-
-        context = self._build_context(
+    def _messages(self, query, vector_docs, sql_rows, chat_history):
+        context, context_tokens = self._build_context(
             vector_docs=vector_docs,
             sql_rows=sql_rows,
         )
+        print(f"context tokens: {context_tokens}/{self.context_budget}")
 
-        messages = self.prompt.format_messages(
+        return self.prompt.format_messages(
             context=context,
             question=query,
-            chat_history=chat_history,
+            chat_history=self._history(chat_history),
         )
 
+    def _history(self, chat_history) -> list:
+        """
+        A ChatHistory supplies its own token-bounded messages; a plain
+        message list is cut to the last `history_size` turns.
+        """
+        if isinstance(chat_history, ChatHistory):
+            return chat_history.messages()
+
+        return list(chat_history or [])[-2 * self.history_size:]
+
+    def run(
+        self,
+        query: str,
+        vector_docs: list[Document] = [],
+        sql_rows: list[dict] = [],
+        chat_history=None,
+    ):
+        messages = self._messages(query, vector_docs, sql_rows, chat_history)
+
         response = self.llm.invoke(messages)
         return response.content
 
+    def stream(
+        self,
+        query: str,
+        vector_docs: list[Document] = [],
+        sql_rows: list[dict] = [],
+        chat_history=None,
+        *,
+        started_at: float | None = None,
+    ) -> AnswerStream:
+        """
+        Same prompt as run(), but tokens are yielded as the LLM emits them.
+        Pass `started_at` (perf_counter) to measure TTFT from the start of
+        the request rather than from the LLM call.
+        """
+        messages = self._messages(query, vector_docs, sql_rows, chat_history)
+
+        def tokens():
+            for chunk in self.llm.stream(messages):
+                yield chunk.content
+
+        return AnswerStream(tokens(), started_at=started_at)
+
 
 
     
@@ -0,0 +1,148 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from src.util.count_tokens import count_tokens, truncate_tokens
+
+SUMMARY_PROMPT = """
+You maintain a running summary of a conversation between a user and an
+assistant answering questions about a university.
+
+Current summary:
+{summary}
+
+New exchanges to fold in:
+{turns}
+
+Write the updated summary in at most {max_tokens} tokens. Keep names,
+subjects, dates and other facts the user may refer back to. Plain text,
+no preamble.
+"""
+
+
+class ChatHistory:
+    """
+    Token-bounded chat history for one session.
+
+    The last `keep_turns` (question, answer) turns are kept verbatim; older
+    turns are folded into a rolling summary by the LLM on a background
+    thread after each answer, so summarizing never delays a response.
+    messages() returns summary + turns trimmed to `max_tokens`, so the
+    history part of the prompt stays flat however long the session runs.
+    """
+
+    def __init__(
+        self,
+        *,
+        llm,
+        max_tokens: int = 1500,
+        keep_turns: int = 3,
+        summary_tokens: int = 300,
+    ):
+        self.llm = llm
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.summary_tokens = summary_tokens
+
+        self._lock = threading.Lock()
+        self._summary = ""
+        # turns waiting to be folded into the summary
+        self._pending: list[tuple[str, str]] = []
+        self._turns: list[tuple[str, str]] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-summary")
+        self._future = None
+        self._running = False
+        # bumped by clear() so an in-flight summary of the old session is dropped
+        self._generation = 0
+
+    def add_turn(self, question: str, answer: str):
+        with self._lock:
+            self._turns.append((question, answer))
+
+            overflow = len(self._turns) - self.keep_turns
+            if overflow > 0:
+                self._pending.extend(self._turns[:overflow])
+                self._turns = self._turns[overflow:]
+
+            if self._pending and not self._running:
+                self._running = True
+                self._future = self._executor.submit(self._summarize)
+
+    def messages(self) -> list[BaseMessage]:
+        """
+        Summary first, then turns oldest -> newest. Turns not yet folded
+        into the summary are included while they fit; the oldest are
+        dropped first when over budget.
+        """
+        with self._lock:
+            summary = self._summary
+            turns = self._pending + self._turns
+
+        budget = self.max_tokens
+        head: list[BaseMessage] = []
+
+        if summary:
+            text = f"Summary of the earlier conversation:\n{summary}"
+            budget -= count_tokens(text)
+            head.append(SystemMessage(content=text))
+
+        kept: list[BaseMessage] = []
+        for question, answer in reversed(turns):
+            cost = count_tokens(question) + count_tokens(answer)
+            if cost > budget:
+                break
+            budget -= cost
+            kept[:0] = [HumanMessage(content=question), AIMessage(content=answer)]
+
+        return head + kept
+
+    def clear(self):
+        with self._lock:
+            self._summary = ""
+            self._pending = []
+            self._turns = []
+            self._generation += 1
+
+    def wait(self, timeout: float | None = None):
+        """
+        Block until the background summary (if any) is done. For tests/CLI exit.
+        """
+        future = self._future
+        if future is not None:
+            future.result(timeout=timeout)
+
+    # ---------- internals ----------
+
+    def _summarize(self):
+        # keep folding until nothing is pending (turns may arrive meanwhile)
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                summary = self._summary
+                batch = list(self._pending)
+                generation = self._generation
+
+            turns = "\n".join(f"User: {q}\nAssistant: {a}" for q, a in batch)
+            prompt = SUMMARY_PROMPT.format(
+                summary=summary or "(empty)",
+                turns=turns,
+                max_tokens=self.summary_tokens,
+            )
+
+            try:
+                updated = self.llm.invoke(prompt).content.strip()
+            except Exception as e:
+                # keep the turns pending; the next add_turn retries
+                print(f"chat summary failed: {e}")
+                with self._lock:
+                    self._running = False
+                return
+
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                self._summary = truncate_tokens(updated, self.summary_tokens)
+                self._pending = self._pending[len(batch):]
@@ -0,0 +1,268 @@
+import glob
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, List
+
+from langchain_core.documents import Document
+
+from src.database.vector.vector_ingestor import VectorIngestor
+from src.models.user import User
+from src.pipelines.loaders import SUPPORTED_EXTENSIONS, create_loader
+
+
+def _parse_file(path: str, splitter, owner: dict, batch_size: int) -> List[List[Document]]:
+    """
+    Process-pool worker: load + split one file into chunk batches.
+    Runs in a child process, so it only gets picklable arguments.
+    """
+    batches: List[List[Document]] = []
+    batch: List[Document] = []
+
+    for doc in create_loader(path).lazy_load():
+        doc.metadata = {**(doc.metadata or {}), **owner}
+
+        for chunk in splitter.split_documents([doc]):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                batches.append(batch)
+                batch = []
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+class EmbeddingBatcher:
+    """
+    Shares one embedder between concurrent writers. embed_documents()
+    calls from different threads are queued and coalesced into a single
+    model call of up to `max_batch` texts (waiting at most `max_wait`
+    seconds for more work), so many small files still embed in large
+    batches.
+    """
+
+    def __init__(self, embedder, *, max_batch: int = 256, max_wait: float = 0.02):
+        self.embedder = embedder
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._pending: list[tuple[list[str], Future]] = []
+        self._closed = False
+        self._worker = threading.Thread(target=self._loop, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            self._pending.append((list(texts), future))
+            self._cond.notify()
+        return future.result()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embedder.embed_query(text)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+
+    def _take(self) -> list[tuple[list[str], Future]]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+
+            deadline = time.monotonic() + self.max_wait
+            while not self._closed and sum(len(t) for t, _ in self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            taken, size = [], 0
+            while self._pending and (not taken or size + len(self._pending[0][0]) <= self.max_batch):
+                texts, future = self._pending.pop(0)
+                taken.append((texts, future))
+                size += len(texts)
+
+            return taken
+
+    def _loop(self):
+        while True:
+            taken = self._take()
+            if not taken:
+                return
+
+            try:
+                embeddings = self.embedder.embed_documents([t for texts, _ in taken for t in texts])
+            except BaseException as e:
+                for _, future in taken:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for texts, future in taken:
+                future.set_result(embeddings[offset:offset + len(texts)])
+                offset += len(texts)
+
+
+class DirectoryIngestion:
+    """
+    Bulk ingestion of every supported file under a directory or glob.
+
+    Files are parsed and split in a process pool (`parse_workers`), then
+    written by `write_workers` threads, each file in its own transaction
+    through VectorIngestor (incremental, bulk inserts). All writers share
+    one EmbeddingBatcher. A file that fails to parse or write is reported
+    in `errors` and does not affect the others.
+
+    Both stages are bounded: at most 2 * parse_workers files are being
+    parsed and at most 2 * write_workers parsed files wait on the writers,
+    so memory stays flat however large the directory is.
+    """
+
+    def __init__(
+        self,
+        *,
+        splitter,
+        ingestor: VectorIngestor,
+        parse_workers: int | None = None,
+        write_workers: int = 4,
+        batch_size: int = 64,
+        embed_batch_size: int = 256,
+    ):
+        self.splitter = splitter
+        self.ingestor = ingestor
+        self.parse_workers = parse_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.write_workers = write_workers
+        self.batch_size = batch_size
+        self.embed_batch_size = embed_batch_size
+
+    def find_files(self, path: str) -> list[str]:
+        if os.path.isdir(path):
+            pattern = os.path.join(path, "**", "*")
+        else:
+            pattern = path
+
+        return sorted(
+            p for p in glob.glob(pattern, recursive=True)
+            if os.path.isfile(p) and p.endswith(SUPPORTED_EXTENSIONS)
+        )
+
+    def run(
+        self,
+        path: str,
+        user: User,
+        *,
+        progress: Callable[[dict], None] | None = None,
+    ) -> dict:
+        if not all([self.splitter, self.ingestor]):
+            raise ValueError("DirectoryIngestion is not fully configured")
+
+        files = self.find_files(path)
+        owner = {
+            "owner_id": str(user.id),
+            "role": user.role,
+            "access_level": user.access_level,
+        }
+
+        batcher = EmbeddingBatcher(self.ingestor.embedder, max_batch=self.embed_batch_size)
+        writer = VectorIngestor(
+            vector_store=self.ingestor.store,
+            embedder=batcher,
+            pool=self.ingestor.pool,
+            faiss_index=self.ingestor.faiss_index,
+        )
+
+        results: dict[str, dict] = {}
+        errors: dict[str, str] = {}
+        lock = threading.Lock()
+        start = time.perf_counter()
+
+        def done(file_path: str, result: dict | None = None, error: Exception | None = None):
+            with lock:
+                if error is not None:
+                    errors[file_path] = repr(error)
+                else:
+                    results[file_path] = result
+                if progress:
+                    progress({"files": len(files), "done": len(results), "failed": len(errors), "path": file_path})
+
+        # parsed files held in memory until a writer has committed them
+        write_slots = threading.BoundedSemaphore(self.write_workers * 2)
+
+        def write(file_path: str, batches: List[List[Document]]):
+            try:
+                done(file_path, result=writer.ingest_batches(batches))
+            except Exception as e:
+                done(file_path, error=e)
+            finally:
+                write_slots.release()
+
+        # spawn: the parent holds threads (pool, batcher) and possibly torch
+        context = multiprocessing.get_context("spawn")
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=context) as parsers, \
+                 ThreadPoolExecutor(max_workers=self.write_workers, thread_name_prefix="dir-ingest") as writers:
+                paths = iter(files)
+                parsing: dict[Future, str] = {}
+
+                def fill():
+                    while len(parsing) < self.parse_workers * 2:
+                        file_path = next(paths, None)
+                        if file_path is None:
+                            return
+                        future = parsers.submit(_parse_file, file_path, self.splitter, owner, self.batch_size)
+                        parsing[future] = file_path
+
+                fill()
+                while parsing:
+                    finished, _ = wait(parsing, return_when=FIRST_COMPLETED)
+
+                    for future in finished:
+                        file_path = parsing.pop(future)
+                        try:
+                            batches = future.result()
+                        except Exception as e:
+                            done(file_path, error=e)
+                            continue
+
+                        # blocks while the writers are behind
+                        write_slots.acquire()
+                        writers.submit(write, file_path, batches)
+
+                    fill()
+        finally:
+            batcher.close()
+
+        return self._summary(files, results, errors, time.perf_counter() - start)
+
+    def _summary(self, files: list[str], results: dict, errors: dict, elapsed: float) -> dict:
+        chunks = sum(r["chunks"] for r in results.values())
+        embed_s = sum(r["embed_s"] for r in results.values())
+        db_s = sum(r["db_s"] for r in results.values())
+
+        return {
+            "files": len(files),
+            "ingested": len(results),
+            "failed": len(errors),
+            "chunks": chunks,
+            "added": sum(r["added"] for r in results.values()),
+            "kept": sum(r["kept"] for r in results.values()),
+            "removed": sum(r["removed"] for r in results.values()),
+            "elapsed_s": elapsed,
+            "files_per_s": len(results) / elapsed if elapsed else 0.0,
+            "chunks_per_s": chunks / elapsed if elapsed else 0.0,
+            # summed over writer threads, so they can exceed elapsed_s
+            "embed_s": embed_s,
+            "db_s": db_s,
+            "errors": errors,
+        }
@@ -0,0 +1,14 @@
+from langchain_community.document_loaders import TextLoader, PyPDFLoader, Docx2txtLoader
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf", ".docx")
+
+
+def create_loader(path: str):
+    if path.endswith(".txt"):
+        return TextLoader(path)
+    elif path.endswith(".pdf"):
+        return PyPDFLoader(path)
+    elif path.endswith(".docx"):
+        return Docx2txtLoader(path)
+    else:
+        raise ValueError("Unsupported file type")
@@ -1,11 +1,134 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
 from langchain_core.documents import Document
 
+from src.util.lazy import Lazy
+
+
+def _load_cross_encoder(model_name: str):
+    # deferred: sentence-transformers pulls in torch
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name, device="cpu")
+
 
 class Reranker:
+    """
+    Cross-encoder reranking of vector candidates.
+
+    All uncached (query, chunk) pairs are scored in one batched CPU forward
+    pass. Scores are cached by (sha256(query), chunk_id). If scoring does
+    not finish within `latency_budget` seconds the candidates are returned
+    in their original vector order; the late scores still land in the
+    cache for the next identical query.
+
+    The budget covers scoring only: warm() loads the model in the
+    background (call it when a query session starts) and run() waits for the load before the clock
+    starts. A timed-out job that has not started yet is cancelled; while
+    one that has started is still scoring, new queries skip reranking
+    instead of queueing behind it.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        *,
+        batch_size: int = 32,
+        cache_size: int = 10_000,
+        latency_budget: float | None = 0.5,
+    ):
+        self.model = Lazy("cross-encoder", lambda: _load_cross_encoder(model_name))
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.latency_budget = latency_budget
+
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple[str, str], float] = OrderedDict()
+        # last job that overran its budget; while it is not done it holds
+        # the reranker thread and new queries skip reranking
+        self._inflight = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+
+    def warm(self):
+        """
+        Start loading the cross-encoder on the reranker thread.
+        """
+        return self.executor.submit(self.model.get)
+
+    def _score(self, query: str, texts: list[str]) -> list[float]:
+        scores = self.model.predict(
+            [(query, text) for text in texts],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+        return [float(s) for s in scores]
+
+    def _cache_scores(self, keys: list[tuple[str, str]], scores: list[float]):
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _finish(self, keys: list[tuple[str, str]], future):
+        if future.cancelled():
+            return
+
+        if not future.exception():
+            self._cache_scores(keys, future.result())
+
+    def run(self, query: str, docs: list[Document], top_n: int = 4) -> list[Document]:
+        if not docs:
+            return []
+
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        keys = [(query_hash, doc.metadata.get("chunk_id") or doc.page_content) for doc in docs]
+
+        scores: dict[tuple[str, str], float] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[key] = self._cache[key]
+
+        missing = [(key, doc) for key, doc in zip(keys, docs) if key not in scores]
+
+        if missing:
+            # model load is not part of the latency budget
+            self.model.get()
+
+            with self._lock:
+                stale = self._inflight is not None and not self._inflight.done()
+            if stale:
+                print("reranker busy with a timed-out job, keeping vector order")
+                return docs[:top_n]
+
+            missing_keys = [key for key, _ in missing]
+            future = self.executor.submit(self._score, query, [doc.page_content for _, doc in missing])
+            future.add_done_callback(lambda f: self._finish(missing_keys, f))
+
+            try:
+                new_scores = future.result(timeout=self.latency_budget)
+            except FutureTimeout:
+                if not future.cancel():
+                    with self._lock:
+                        self._inflight = future
+                print(f"reranker exceeded {self.latency_budget}s, keeping vector order")
+                return docs[:top_n]
+
+            scores.update(zip(missing_keys, new_scores))
 
-    def __init__(self, embedder, llm):
-        self.embedder = embedder
-        self.llm = llm
+        ranked = sorted(zip(keys, docs), key=lambda kd: scores[kd[0]], reverse=True)
 
-    def run(self, query:str, docs:list[Document]) -> list[Document]:
-        raise NotImplementedError
\ No newline at end of file
+        return [
+            Document(
+                page_content=doc.page_content,
+                metadata={**doc.metadata, "rerank_score": scores[key]},
+            )
+            for key, doc in ranked[:top_n]
+        ]
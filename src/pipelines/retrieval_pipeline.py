@@ -1,8 +1,12 @@
 import json
 import re
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
 from src.database.sql.sql_retriever import SQLRetriever
 from src.database.vector.vector_retriever import VectorRetriever
+from src.pipelines.reranker_pipeline import Reranker
 from src.models.user import User
+from src.util.deadline_executor import DeadlineExecutor
 from langchain_core.documents import Document
 
 
@@ -11,23 +15,52 @@ class RetrievalPipeline:
         self,
         vector_retriever: VectorRetriever,
         sql_retriever: SQLRetriever,
-        routing_llm
+        routing_llm,
+        *,
+        vector_timeout: float | None = 10.0,
+        sql_timeout: float | None = 30.0,
+        reranker: Reranker | None = None,
+        rerank_candidates: int = 20,
+        branch_workers: int = 4,
     ):
+        """
+        vector_timeout / sql_timeout:
+            Per-branch deadlines (seconds, measured from the start of run).
+            None waits indefinitely.
+        branch_workers:
+            Threads per branch. Each branch has its own executor, so slow
+            SQL never delays vector retrieval.
+        reranker / rerank_candidates:
+            When set, the vector branch over-fetches `rerank_candidates`
+            chunks and the reranker keeps the best `top_n`.
+        """
         self.vector_retriever = vector_retriever
         self.sql_retriever = sql_retriever
         self.routing_llm = routing_llm
+        self.vector_timeout = vector_timeout
+        self.sql_timeout = sql_timeout
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self.executors = {
+            name: DeadlineExecutor(max_workers=branch_workers, thread_name_prefix=f"retrieval-{name}")
+            for name in ("vector", "sql")
+        }
 
 
 
     def _get_vector_results(
-        self, query: str, user: User, k: int
+        self, query: str, user: User, k: int, top_n: int, metadata_filter: dict | None = None
     ) -> list[Document]:
         results =  self.vector_retriever.retrieve(
             query=query,
             user=user,
-            k=k,
+            k=max(k, self.rerank_candidates) if self.reranker else k,
+            metadata_filter=metadata_filter,
         )
 
+        if self.reranker:
+            results = self.reranker.run(query, results, top_n=top_n)
+
         print(f"""\n\nVector Results\n\n""")
 
         for result in results:
@@ -40,23 +73,103 @@ class RetrievalPipeline:
     ) -> list[dict]:
         results = self.sql_retriever.retrieve(query=query, user=user)
         print(f"""\n\nSQL Results\n\n""")
-        return results
+        return results or []
+
+    def _timed(self, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        return result, time.perf_counter() - start
+
+    def _submit(self, name: str, partial: bool, fn, *args, **kwargs):
+        """
+        Submit a branch run. With partial results allowed, return None
+        instead while the branch's workers are all held by timed-out runs.
+        """
+        executor = self.executors[name]
+        if partial and executor.saturated:
+            return None
+
+        return executor.submit(self._timed, fn, *args, **kwargs)
+
+    def run(
+        self,
+        query: str,
+        user: User,
+        k: int = 5,
+        top_n: int = 4,
+        *,
+        partial: bool = True,
+        metadata_filter: dict | None = None,
+    ):
+        """
+        Runs the vector and SQL branches concurrently.
 
+        metadata_filter is pushed down into the vector search
+        (see VectorRetriever.retrieve).
 
-    def run(self, query: str, user: User, k: int = 5, top_n: int = 4):
+        partial=True  -> a branch that misses its deadline (or raises) is
+                         reported and contributes no results; the other
+                         branch's results are still returned.
+        partial=False -> wait for both branches and propagate errors.
+
+        A timed-out branch is cancelled if it has not started; otherwise it
+        finishes in its worker thread and its result is discarded. While
+        all of a branch's workers are busy that way, the branch is skipped
+        and reported as timed out. SQL statements are also bounded by the
+        pool's statement_timeout.
+        """
         if not self.vector_retriever:
             raise ValueError("Pipeline dependencies not initialised")
 
-        vector_chunks = self._get_vector_results(query, user, k)
-        sql_chunks = self._get_sql_results(query=query, user=user, k=k)
+        start = time.perf_counter()
+
+        branches = {
+            "vector": (
+                self._submit("vector", partial, self._get_vector_results, query, user, k, top_n, metadata_filter),
+                self.vector_timeout,
+            ),
+            "sql": (
+                self._submit("sql", partial, self._get_sql_results, query=query, user=user, k=k),
+                self.sql_timeout,
+            ),
+        }
 
         output = {
-            "vector": vector_chunks,
-            "sql": sql_chunks
+            "vector": [],
+            "sql": [],
+            "latency": {},
+            "timed_out": [],
+            "errors": {},
         }
 
+        for name, (future, timeout) in branches.items():
+            if future is None:
+                print(f"{name} retrieval is saturated, continuing without it")
+                output["timed_out"].append(name)
+                output["latency"][name] = None
+                continue
+
+            if not partial:
+                output[name], output["latency"][name] = future.result()
+                continue
+
+            remaining = None
+            if timeout is not None:
+                remaining = max(0.0, timeout - (time.perf_counter() - start))
+
+            try:
+                output[name], output["latency"][name] = future.result(timeout=remaining)
+            except FutureTimeout:
+                self.executors[name].abandon(future)
+                print(f"{name} retrieval exceeded {timeout}s, continuing without it")
+                output["timed_out"].append(name)
+                output["latency"][name] = None
+            except Exception as e:
+                print(f"{name} retrieval failed: {e}")
+                output["errors"][name] = str(e)
+                output["latency"][name] = time.perf_counter() - start
+
+        output["latency"]["total"] = time.perf_counter() - start
+
         print(output)
         return output
-
-        # routing =  self._route_query(query=query)
-        # print(routing)
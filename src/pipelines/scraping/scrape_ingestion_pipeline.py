@@ -1,6 +1,7 @@
 import json
 import uuid
 
+from src.database.db import to_vector
 from src.models.user import User
 from langchain_core.documents import Document
 
@@ -205,7 +206,7 @@ class ScrapeIngestionPipeline:
             faculty_id = data["id"]
 
             for surface in self._faculty_surface_forms(name):
-                vec = self.embedder.embed_query(surface)
+                vec = to_vector(self.embedder.embed_query(surface))
 
                 self.sql_ingester.ingest(
                     sql_obj={
@@ -236,7 +237,7 @@ class ScrapeIngestionPipeline:
             }
 
             for surface in forms:
-                vec = self.embedder.embed_query(surface)
+                vec = to_vector(self.embedder.embed_query(surface))
 
                 self.sql_ingester.ingest(
                     sql_obj={
@@ -284,7 +285,9 @@ class ScrapeIngestionPipeline:
                 "owner_id": user.id,
                 "access_level":user.access_level,
                 "role":user.role,
-                "source": "faculty"
+                # one file per department, so re-ingesting a department
+                # never diffs against (and drops) another one's chunks
+                "source": f"faculty:{dept_id}"
             }
 
             # --- core profile chunk ---
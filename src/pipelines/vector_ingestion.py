@@ -1,20 +1,98 @@
-from typing import List
+import queue
+import threading
+from typing import Callable, Iterator, List
 from langchain_core.documents import Document
 from src.models.user import User
 
+_DONE = object()
+
 
 class VectorIngestion:
-    def __init__(self, *, splitter, ingestor):
+    """
+    Streaming ingestion: loader pages are split as they arrive and grouped
+    into fixed-size chunk batches. A producer thread loads + splits while
+    the caller's thread embeds + inserts, with at most `queue_size`
+    batches buffered in between, so memory stays bounded by the batch
+    size rather than the document size. The whole file is still committed
+    once, at the end.
+    """
+
+    def __init__(self, *, splitter, ingestor, batch_size: int = 64, queue_size: int = 4):
         self.splitter = splitter
         self.ingestor = ingestor
+        self.batch_size = batch_size
+        self.queue_size = queue_size
 
-    def run(self, loader, user: User):
+    def run(
+        self,
+        loader,
+        user: User,
+        *,
+        progress: Callable[[dict], None] | None = None,
+    ) -> dict:
         if not all([self.splitter, self.ingestor]):
             raise ValueError("VectorIngestion is not fully configured")
 
-        docs: List[Document] = loader.load()
+        state = {"pages": 0}
+        batches = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        producer = threading.Thread(
+            target=self._produce,
+            args=(loader, user, batches, stop, state),
+            name="vector-ingestion-loader",
+            daemon=True,
+        )
+        producer.start()
+
+        def report(stats: dict):
+            if progress:
+                progress({"pages": state["pages"], **stats})
+
+        try:
+            stats = self.ingestor.ingest_batches(self._consume(batches), progress=report)
+        finally:
+            # unblock the producer if the consumer bailed out early
+            stop.set()
+            while producer.is_alive():
+                try:
+                    batches.get_nowait()
+                except queue.Empty:
+                    producer.join(timeout=0.1)
+
+        return {
+            "status": "success" if stats["chunks"] else "no_docs",
+            "pages": state["pages"],
+            **stats,
+        }
+
+    # ---------- stages ----------
+
+    def _produce(self, loader, user: User, batches: queue.Queue, stop: threading.Event, state: dict):
+        try:
+            for batch in self._split_batches(loader, user, state):
+                if stop.is_set():
+                    return
+                batches.put(batch)
+            batches.put(_DONE)
+        except BaseException as e:
+            batches.put(e)
+
+    def _consume(self, batches: queue.Queue) -> Iterator[List[Document]]:
+        while True:
+            item = batches.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def _split_batches(self, loader, user: User, state: dict) -> Iterator[List[Document]]:
+        batch: List[Document] = []
+
+        for doc in loader.lazy_load():
+            state["pages"] += 1
 
-        for doc in docs:
             original_meta = doc.metadata or {}
             doc.metadata = {
                 **original_meta,
@@ -23,6 +101,11 @@ class VectorIngestion:
                 "access_level": user.access_level,
             }
 
-        chunks: List[Document] = self.splitter.split_documents(docs)
+            for chunk in self.splitter.split_documents([doc]):
+                batch.append(chunk)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
 
-        return self.ingestor.ingest_documents(chunks)
+        if batch:
+            yield batch
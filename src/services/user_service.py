@@ -1,5 +1,5 @@
 import uuid
-from src.database.db import get_connection
+from src.database.db import get_pool
 from src.models.user import User
 
 def create_user(
@@ -15,11 +15,10 @@ def create_user(
     RETURNING id, username, role, access_level;
     """
 
-    with get_connection() as conn:
+    with get_pool().connection() as conn:
         with conn.cursor() as cur:
             cur.execute(query, (str(user_id), username, role, access_level))
             row = cur.fetchone()
-            conn.commit()
 
     return User(
         id=row[0],
@@ -36,11 +35,10 @@ def user_login(username: str):
     WHERE username = %s
     """
 
-    with get_connection() as conn:
+    with get_pool().connection() as conn:
         with conn.cursor() as cur:
             cur.execute(query, (username, ))
             row = cur.fetchone()
-            conn.commit()
 
         if row == None:
             return None
@@ -1,3 +1,41 @@
-def count_tokens(prompt: str) -> int:
-    # Gemini ~ 4 chars per token (rough)
-    return len(prompt) // 4
+from functools import lru_cache
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=4)
+def _encoding(name: str):
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # tiktoken fetches its BPE files on first use; offline we fall
+        # back to the character heuristic below
+        return None
+
+
+def count_tokens(prompt: str, encoding: str = DEFAULT_ENCODING) -> int:
+    enc = _encoding(encoding)
+    if enc is None:
+        # ~ 4 chars per token (rough), rounded up so budgets hold
+        return (len(prompt) + 3) // 4
+    return len(enc.encode(prompt, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, encoding: str = DEFAULT_ENCODING) -> str:
+    """
+    Cut `text` to at most `max_tokens` tokens, marking the cut with "...".
+    """
+    if max_tokens <= 0:
+        return ""
+
+    enc = _encoding(encoding)
+    if enc is None:
+        limit = max_tokens * 4
+        return text if len(text) <= limit else text[: max(0, limit - 4)] + "..."
+
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[: max(0, max_tokens - 1)]) + "..."
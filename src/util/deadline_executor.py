@@ -0,0 +1,44 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class DeadlineExecutor:
+    """
+    Thread pool for work that callers wait on with a deadline.
+
+    A caller that gives up on a future hands it to abandon(): it is
+    cancelled if it has not started, otherwise it is counted until it
+    finishes. While every worker is held by abandoned runs the pool is
+    `saturated`; callers should skip submitting (new work would only
+    queue behind the stuck runs and miss its own deadline).
+    """
+
+    def __init__(self, *, max_workers: int, thread_name_prefix: str = ""):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._abandoned = 0
+
+    @property
+    def saturated(self) -> bool:
+        with self._lock:
+            return self._abandoned >= self.max_workers
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def abandon(self, future: Future):
+        if future.cancel():
+            return
+
+        with self._lock:
+            self._abandoned += 1
+
+        future.add_done_callback(self._release)
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self._abandoned -= 1
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
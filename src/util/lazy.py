@@ -0,0 +1,58 @@
+import threading
+import time
+
+# guards _timings only
+_lock = threading.Lock()
+_timings: dict[str, float] = {}
+
+
+class Lazy:
+    """
+    Proxy that builds `factory()` on first attribute access, once per
+    process, and records how long construction took for boot_report().
+    Each proxy has its own lock, so a slow factory never blocks another.
+    """
+
+    def __init__(self, name: str, factory):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start = time.perf_counter()
+                    self._instance = self._factory()
+                    record(self._name, time.perf_counter() - start)
+        return self._instance
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
+
+
+def record(name: str, seconds: float):
+    with _lock:
+        _timings[name] = _timings.get(name, 0.0) + seconds
+
+
+def boot_report() -> str:
+    with _lock:
+        timings = dict(_timings)
+
+    if not timings:
+        return "boot: nothing loaded yet"
+
+    width = max(len(name) for name in [*timings, "total"])
+    lines = [
+        f"  {name:<{width}}  {seconds * 1000:>9.1f} ms"
+        for name, seconds in sorted(timings.items(), key=lambda kv: -kv[1])
+    ]
+    total = sum(timings.values())
+
+    return "\n".join(["boot:", *lines, f"  {'total':<{width}}  {total * 1000:>9.1f} ms"])
@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+from src.util.deadline_executor import DeadlineExecutor
+
+
+def test_saturated_until_abandoned_runs_finish():
+    executor = DeadlineExecutor(max_workers=1)
+    release = threading.Event()
+
+    future = executor.submit(release.wait)
+    with pytest.raises(FutureTimeout):
+        future.result(timeout=0.01)
+    executor.abandon(future)
+
+    assert executor.saturated
+
+    release.set()
+    future.result()
+
+    assert not executor.saturated
+
+
+def test_abandoning_a_queued_run_cancels_it():
+    executor = DeadlineExecutor(max_workers=1)
+    release = threading.Event()
+
+    running = executor.submit(release.wait)
+    queued = executor.submit(lambda: None)
+    executor.abandon(queued)
+
+    assert queued.cancelled()
+    assert not executor.saturated
+
+    release.set()
+    running.result()
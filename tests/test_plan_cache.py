@@ -0,0 +1,41 @@
+from src.database.sql.plan_cache import PlanCache
+
+EMBEDDING = [1.0, 0.0, 0.0]
+NORMALIZED = {
+    "queries": [
+        {"entities": [{"type": "subject", "raw_value": "cloud computing"}]},
+    ]
+}
+
+
+def _cache(query: str) -> PlanCache:
+    cache = PlanCache()
+    cache.put(query=query, embedding=EMBEDDING, version=1, normalized=NORMALIZED, steps=[])
+    return cache
+
+
+def test_paraphrase_reuses_plan():
+    cache = _cache("who teaches cloud computing")
+
+    plan = cache.get(query="cloud computing is taught by whom", embedding=EMBEDDING, version=1)
+
+    assert plan is not None
+    assert plan.query == "who teaches cloud computing"
+
+
+def test_different_day_misses():
+    cache = _cache("cloud computing classes on monday")
+
+    assert cache.get(query="cloud computing classes on tuesday", embedding=EMBEDDING, version=1) is None
+
+
+def test_different_number_misses():
+    cache = _cache("cloud computing classes after 10am")
+
+    assert cache.get(query="cloud computing classes after 2pm", embedding=EMBEDDING, version=1) is None
+
+
+def test_missing_entity_misses():
+    cache = _cache("who teaches cloud computing")
+
+    assert cache.get(query="who teaches data mining", embedding=EMBEDDING, version=1) is None
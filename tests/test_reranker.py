@@ -0,0 +1,55 @@
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from langchain_core.documents import Document
+
+from src.pipelines.reranker_pipeline import Reranker
+
+
+class FakeModel:
+    def get(self):
+        return self
+
+    def predict(self, pairs, **kwargs):
+        return [len(text) for _, text in pairs]
+
+
+class LateFuture(Future):
+    """
+    Finishes, then still reports a timeout: the job completed between
+    the budget running out and run() trying to cancel it.
+    """
+
+    def result(self, timeout=None):
+        if timeout is not None:
+            super().result()
+            raise FutureTimeout()
+        return super().result()
+
+
+class LateExecutor:
+    def submit(self, fn, *args):
+        future = LateFuture()
+        future.set_running_or_notify_cancel()
+        future.set_result(fn(*args))
+        return future
+
+
+def _docs():
+    return [
+        Document(page_content="x" * i, metadata={"chunk_id": str(i)})
+        for i in range(1, 4)
+    ]
+
+
+def test_job_finishing_after_timeout_does_not_disable_reranking():
+    reranker = Reranker(latency_budget=0.1)
+    reranker.model = FakeModel()
+
+    reranker.executor = LateExecutor()
+    timed_out = reranker.run("first", _docs(), top_n=3)
+    assert [d.metadata.get("rerank_score") for d in timed_out] == [None, None, None]
+
+    reranker.executor = ThreadPoolExecutor(max_workers=1)
+    ranked = reranker.run("second", _docs(), top_n=3)
+
+    assert [d.metadata["chunk_id"] for d in ranked] == ["3", "2", "1"]